@@ -0,0 +1,220 @@
+"""
+Benchmark des handlers de log sous charge: logs_v1 (RotatingFileHandler),
+logs_v2 et logs_v3 (DateBasedFileHandler), via leur get_logger().
+
+Chaque (variante, scénario) tourne dans un nouveau process Python, avec un module
+'consts' de remplacement (LOG_FOLDER = dossier temporaire, MAX_SIZE_PER_LOG_FILE /
+BACKUP_COUNT du scénario) injecté avant l'import du module de log.
+
+Scénarios:
+  - steady    : gros fichiers, pas de rotation
+  - rotation  : petits fichiers (max_bytes faible) -> rotation très fréquente
+  - retained  : dossier pré-rempli de nombreux vieux fichiers (BACKUP_COUNT atteint),
+                chaque rotation déclenche le nettoyage
+
+Mesures: records/s (boucle + close/flush final), latence p50 / p99 d'un logger.info(),
+temps de get_logger() (startup), et appels système pendant la boucle:
+  - write / read : syscw / syscr de /proc/self/io (Linux uniquement, sinon "-")
+  - open, listdir, rename, remove : audit hooks Python
+  - stat : appels à os.stat (os.path.getsize / getmtime compris)
+
+Par défaut 2M records par run (ordre de grandeur d'une journée chargée d'exposition):
+compter 1 à 2 min par (variante, scénario); -n plus petit pour un essai rapide.
+
+Usage:
+    python bench_handlers.py [-n 2000000] [--variants v1,v2,v3] [--scenarios steady,rotation,retained]
+"""
+import argparse
+import importlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from array import array
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# nom -> (module, kwargs de get_logger)
+VARIANTS = {
+    "v1": ("logs_v1", {}),
+    "v2": ("logs_v2", {}),
+    "v3": ("logs_v3", {}),
+    "v3-buffered": ("logs_v3", {"buffer_records": 100, "flush_interval_ms": 1000}),
+    "v3-async": ("logs_v3", {"async_mode": True}),
+}
+
+# nom -> (MAX_SIZE_PER_LOG_FILE, BACKUP_COUNT, nb de vieux fichiers pré-créés)
+SCENARIOS = {
+    "steady": (1024 ** 3, 5, 0),
+    "rotation": (64 * 1024, 100000, 0),
+    "retained": (256 * 1024, 2000, 2000),
+}
+
+MESSAGE = "Button pressed, your horsepower is %d"
+
+
+def _read_proc_io():
+    """{'syscr': n, 'syscw': n} du process courant, ou None hors Linux."""
+    try:
+        with open("/proc/self/io", "r") as f:
+            fields = dict(line.split(":", 1) for line in f)
+        return {k: int(fields[k]) for k in ("syscr", "syscw")}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _install_counters():
+    """Compte les appels fichiers/dossiers (audit hooks + os.stat) à partir de maintenant."""
+    counts = {"open": 0, "stat": 0, "listdir": 0, "rename": 0, "remove": 0}
+    events = {"open": "open", "os.listdir": "listdir", "os.scandir": "listdir",
+              "os.rename": "rename", "os.remove": "remove"}
+    active = [False]
+
+    def hook(event, _args):
+        name = events.get(event)
+        if name is not None and active[0]:
+            counts[name] += 1
+
+    sys.addaudithook(hook)
+
+    real_stat = os.stat
+
+    def counting_stat(*args, **kwargs):
+        if active[0]:
+            counts["stat"] += 1
+        return real_stat(*args, **kwargs)
+
+    os.stat = counting_stat
+    return counts, active
+
+
+def _prefill(folder, module_name, count):
+    """Crée count vieux fichiers au format du module (les plus anciens par mtime)."""
+    old = time.time() - 365 * 24 * 3600
+    for i in range(count):
+        if module_name == "logs_v1":
+            name = f"log.txt.{i + 1}"
+        elif module_name == "logs_v2":
+            name = f"log_2020-01-01({i + 1}).txt"  # v2 ne reconnaît pas les noms _to_
+        else:
+            name = f"log_2020-01-01({i + 1})_to_2020-01-02.txt"
+        path = os.path.join(folder, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("2020-01-01 09:00:00 - old\n")
+        os.utime(path, (old + i, old + i))
+
+
+def _run_worker(variant, scenario, n, folder):
+    module_name, kwargs = VARIANTS[variant]
+    max_bytes, backup_count, prefill = SCENARIOS[scenario]
+
+    consts = types.ModuleType("consts")
+    consts.LOG_FOLDER = folder
+    consts.MAX_SIZE_PER_LOG_FILE = max_bytes
+    consts.BACKUP_COUNT = backup_count
+    sys.modules["consts"] = consts
+
+    os.makedirs(folder, exist_ok=True)
+    _prefill(folder, module_name, prefill)
+
+    sys.path.insert(0, HERE)
+    mod = importlib.import_module(module_name)
+    counts, active = _install_counters()
+
+    t = time.perf_counter()
+    logger = mod.get_logger(**kwargs)
+    startup = time.perf_counter() - t
+
+    latencies = array("q", bytes(8 * n))
+    clock = time.perf_counter_ns
+    info = logger.info
+
+    io_start = _read_proc_io()
+    active[0] = True
+    t = time.perf_counter()
+    for i in range(n):
+        t0 = clock()
+        info(MESSAGE, i)
+        latencies[i] = clock() - t0
+    for handler in list(logger.handlers):
+        handler.close()  # vide les buffers / la queue: inclus dans le débit
+    elapsed = time.perf_counter() - t
+    active[0] = False
+    io_end = _read_proc_io()
+
+    ordered = sorted(latencies)
+    result = {
+        "records_per_s": n / elapsed,
+        "p50_us": ordered[n // 2] / 1000,
+        "p99_us": ordered[min(n - 1, (n * 99) // 100)] / 1000,
+        "startup_ms": startup * 1000,
+        "write": io_end["syscw"] - io_start["syscw"] if io_start and io_end else None,
+        "read": io_end["syscr"] - io_start["syscr"] if io_start and io_end else None,
+    }
+    result.update(counts)
+    print(json.dumps(result))
+
+
+def _run_case(variant, scenario, n):
+    folder = tempfile.mkdtemp(prefix="bench_logs_")
+    try:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", variant, scenario, str(n), folder],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+        )
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    if proc.returncode != 0:
+        last = proc.stderr.strip().splitlines()[-1:] or ["?"]
+        raise RuntimeError(last[0])
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _fmt(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        _, _, variant, scenario, n, folder = sys.argv
+        _run_worker(variant, scenario, int(n), folder)
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark logs_v1 / logs_v2 / logs_v3 sous charge.")
+    parser.add_argument("-n", type=int, default=2_000_000, help="Nb de records par run (défaut: 2000000).")
+    parser.add_argument("--variants", default=",".join(VARIANTS),
+                        help=f"Variantes séparées par des virgules (défaut: {','.join(VARIANTS)}).")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Scénarios séparés par des virgules (défaut: {','.join(SCENARIOS)}).")
+    args = parser.parse_args()
+
+    variants = [v for v in args.variants.split(",") if v]
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = [v for v in variants if v not in VARIANTS] + [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"inconnu: {', '.join(unknown)}")
+
+    header = (f"{'variant':<12} {'rec/s':>10} {'p50 us':>8} {'p99 us':>8} {'start ms':>9} "
+              f"{'write':>8} {'read':>7} {'open':>6} {'stat':>8} {'listdir':>7} {'rename':>6} {'remove':>6}")
+    for scenario in scenarios:
+        max_bytes, backup_count, prefill = SCENARIOS[scenario]
+        print(f"\n== {scenario} (n={args.n}, max_bytes={max_bytes}, "
+              f"BACKUP_COUNT={backup_count}, fichiers pré-créés={prefill})")
+        print(header)
+        for variant in variants:
+            try:
+                r = _run_case(variant, scenario, args.n)
+            except RuntimeError as e:
+                print(f"{variant:<12} FAILED ({e})")
+                continue
+            print(f"{variant:<12} {r['records_per_s']:>10,.0f} {r['p50_us']:>8.1f} {r['p99_us']:>8.1f} "
+                  f"{r['startup_ms']:>9.1f} {_fmt(r['write'], '>8')} {_fmt(r['read'], '>7')} "
+                  f"{r['open']:>6} {r['stat']:>8} {r['listdir']:>7} {r['rename']:>6} {r['remove']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark du mode multiprocess de logs_v3 (DateBasedFileHandler(multiprocess=True)):
+N process écrivent en même temps dans le même LOG_FOLDER (verrou consultatif .log.lock).
+
+Chaque essai: dossier temporaire, module 'consts' de remplacement, N process qui écrivent
+chacun n records, puis vérification que toutes les lignes sont présentes exactement une fois
+et que les fichiers ne dépassent pas max_bytes de plus d'un flush.
+Avec --backup-count: les vieux segments sont supprimés, on vérifie alors que le dossier
+garde exactement backup-count fichiers (rétention du mode multiprocess).
+
+Mesures: records/s (tous process confondus), nb de fichiers, taille du plus gros fichier.
+
+Usage:
+    python bench_multiprocess.py [-n 5000] [--writers 1,2,4] [--max-bytes 50000] [--buffer-records 100]
+                                 [--backup-count 3]
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import types
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _message(writer_id, i):
+    return f"w{writer_id} r{i} " + "x" * (i % 50)
+
+
+def _writer(folder, writer_id, n, max_bytes, backup_count, kwargs):
+    consts = types.ModuleType("consts")
+    consts.LOG_FOLDER = folder
+    consts.MAX_SIZE_PER_LOG_FILE = max_bytes
+    consts.BACKUP_COUNT = backup_count or 1000000
+    sys.modules["consts"] = consts
+    sys.path.insert(0, HERE)
+    import logs_v3
+
+    handler = logs_v3.DateBasedFileHandler(folder, max_bytes, multiprocess=True, **kwargs)
+    for i in range(n):
+        record = logging.LogRecord("bench", logging.INFO, __file__, 1, _message(writer_id, i), None, None)
+        handler.handle(record)
+    handler.close()
+
+
+def _trial(writers, n, max_bytes, kwargs, backup_count=0):
+    folder = tempfile.mkdtemp(prefix="bench_mp_")
+    try:
+        procs = [multiprocessing.Process(target=_writer, args=(folder, w, n, max_bytes, backup_count, kwargs))
+                 for w in range(writers)]
+        t0 = time.perf_counter()
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - t0
+        if any(p.exitcode != 0 for p in procs):
+            raise RuntimeError("un process d'écriture a échoué")
+
+        lines = []
+        sizes = []
+        for fname in os.listdir(folder):
+            if fname.endswith(".txt"):
+                with open(os.path.join(folder, fname), "rb") as f:
+                    data = f.read()
+                sizes.append(len(data))
+                lines += [l.split(" - ", 1)[1] for l in data.decode("utf-8").splitlines()]
+        if backup_count:
+            ok = len(sizes) == backup_count and len(lines) == len(set(lines))
+        else:
+            ok = sorted(lines) == sorted(_message(w, i) for w in range(writers) for i in range(n))
+        return writers * n / elapsed, ok, len(sizes), max(sizes, default=0)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark logs_v3 multiprocess (écrivains concurrents).")
+    parser.add_argument("-n", type=int, default=5000, help="Records par process (défaut: 5000).")
+    parser.add_argument("--writers", default="1,2,4", help="Nb de process à tester (défaut: 1,2,4).")
+    parser.add_argument("--max-bytes", type=int, default=50000, help="Taille max d'un fichier (défaut: 50000).")
+    parser.add_argument("--buffer-records", type=int, default=0,
+                        help="Mode bufferisé: records par flush (défaut: 0 = écriture directe).")
+    parser.add_argument("--backup-count", type=int, default=0,
+                        help="BACKUP_COUNT: vérifie la rétention au lieu des lignes (défaut: 0 = tout garder).")
+    args = parser.parse_args()
+
+    kwargs = {"buffer_records": args.buffer_records} if args.buffer_records else {}
+    print(f"{'writers':>7} {'rec/s':>10} {'check ok':>9} {'fichiers':>8} {'max fichier':>11}")
+    for writers in [int(w) for w in args.writers.split(",") if w]:
+        try:
+            rate, ok, files, biggest = _trial(writers, args.n, args.max_bytes, kwargs, args.backup_count)
+        except RuntimeError as e:
+            print(f"{writers:>7} FAILED ({e})")
+            continue
+        print(f"{writers:>7} {rate:>10,.0f} {str(ok):>9} {files:>8} {biggest:>11}")
+
+
+if __name__ == "__main__":
+    main()
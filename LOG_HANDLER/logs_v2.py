@@ -4,6 +4,17 @@ from consts import MAX_SIZE_PER_LOG_FILE, LOG_FOLDER,BACKUP_COUNT
 import re
 from datetime import datetime
 
+# Taille suivie en mémoire; re-stat de contrôle du fichier courant toutes les N écritures
+SIZE_RESYNC_EVERY = 1000
+# Mode texte: "\n" est écrit "\r\n" sous Windows
+_NEWLINE_EXTRA = len(os.linesep) - 1
+
+
+def _encoded_len(text):
+    """Nb d'octets écrits sur disque pour text (utf-8, newlines du mode texte)."""
+    n = len(text) if text.isascii() else len(text.encode("utf-8", "replace"))
+    return n + text.count("\n") * _NEWLINE_EXTRA
+
 
 class DateBasedFileHandler(logging.Handler):
     def __init__(self, log_folder, max_bytes):
@@ -15,6 +26,8 @@ class DateBasedFileHandler(logging.Handler):
         self.current_log_file = None
         self.current_file_handler = None
         self.backup_count = BACKUP_COUNT
+        self.current_size = 0            # octets du fichier courant (suivi en mémoire)
+        self._writes_since_stat = 0
 
         self._select_startup_file()  # Nouveau comportement au démarrage
 
@@ -75,12 +88,26 @@ class DateBasedFileHandler(logging.Handler):
         self.current_file_handler.setFormatter(logging.Formatter(
             "%(asctime)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
         ))
+        self.current_size = self._stat_current_size()
+        self._writes_since_stat = 0
 
         self._cleanup_old_logs()  # ← AJOUT ICI
 
+    def _stat_current_size(self):
+        """Taille réelle du fichier courant sur disque (0 si absent)."""
+        try:
+            return os.path.getsize(self.current_file_handler.baseFilename)
+        except FileNotFoundError:
+            return 0
+
     def emit(self, record):
+        # Taille suivie en mémoire (plus de stream.tell() à chaque ligne)
+        if self._writes_since_stat >= SIZE_RESYNC_EVERY:
+            self.current_size = self._stat_current_size()
+            self._writes_since_stat = 0
+
         # Si fichier courant est plein
-        if self.current_file_handler.stream.tell() > self.max_bytes:
+        if self.current_size > self.max_bytes:
             today = datetime.now().strftime("%Y-%m-%d")
 
             if today != self.base_date:
@@ -94,7 +121,19 @@ class DateBasedFileHandler(logging.Handler):
             self.current_log_file = self._get_log_filename(self.base_date, self.current_index)
             self._create_log_file(self.current_log_file)
 
-        self.current_file_handler.emit(record)
+        # Écriture réelle (formatage une seule fois: on connaît la taille écrite)
+        handler = self.current_file_handler
+        try:
+            msg = handler.format(record) + handler.terminator
+            handler.stream.write(msg)
+            handler.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            handler.handleError(record)
+            return
+        self.current_size += _encoded_len(msg)
+        self._writes_since_stat += 1
 
     def _cleanup_old_logs(self):
         """Supprime les plus vieux fichiers de log si on dépasse le BACKUP_COUNT."""
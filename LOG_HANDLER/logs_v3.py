@@ -1,12 +1,194 @@
+import atexit
+import calendar
+import contextlib
+import errno
+import gzip
+import json
 import logging
 import os
+import queue
 import re
-from datetime import datetime
+import shutil
+import struct
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener
 from consts import MAX_SIZE_PER_LOG_FILE, LOG_FOLDER, BACKUP_COUNT
 
+# Taille suivie en mémoire; re-stat de contrôle du fichier courant toutes les N écritures
+SIZE_RESYNC_EVERY = 1000
+# Mode texte: "\n" est écrit "\r\n" sous Windows
+_NEWLINE_EXTRA = len(os.linesep) - 1
+# Mode bufferisé: niveau à partir duquel on écrit tout de suite sur disque
+FLUSH_LEVEL = logging.WARNING
+# Archivage des segments finalisés (_to_): log_...txt -> log_...txt.gz
+GZIP_SUFFIX = ".gz"
+COMPRESS_LEVEL = 6
+# Sidecar binaire (sidecar=True): log_...txt -> log_...txt.rec, un record fixe par ligne:
+#   secondes locales depuis 1970 (= timestamp du texte), id du message, payload (NaN si absent)
+SIDECAR_SUFFIX = ".rec"
+SIDECAR_RECORD = struct.Struct("<qid")
+# Record de contrôle (id SIDECAR_SIZE_MARK, t = taille du .txt couvert), écrit à la fermeture:
+# on ne reprend un .rec existant que s'il couvre tout le .txt
+SIDECAR_SIZE_MARK = -2
+# Table id -> modèle de la 1re ligne, partagée par tous les segments: une ligne JSON [id, "modèle"]
+# Modèle = 1re ligne avec les chiffres remplacés par MESSAGE_NUMBER_MARK ("hp: 42" -> "hp: #"),
+# le premier nombre va dans payload (sauf extra={"payload": x})
+MESSAGES_FILE = "log_messages.jsonl"
+# Index de l'analyse (LOG_PLOT_SUMMARY/VERSION_6/log_seek.py): log_...txt -> log_...txt.idx,
+# renommé / supprimé avec son segment, inutile une fois le segment compressé
+INDEX_SUFFIX = ".idx"
+MESSAGE_NUMBER_MARK = "#"
+MAX_MESSAGE_IDS = 1 << 20  # au-delà: id -1 (l'analyse relit alors le texte)
+MESSAGES_PRUNE_MIN = 1024  # au démarrage, au-delà: table réécrite sans les ids absents des .rec
+_LINE_BREAK = re.compile(r"[\r\n]")
+_DIGITS = re.compile(r"\d+")
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+# Mode multiprocess: verrou consultatif + nom du segment courant partagé entre process
+LOCK_FILE = ".log.lock"
+POINTER_FILE = ".log_current"
+# Date de fin d'un segment: jour de la dernière ligne datée, cherchée dans la fin du fichier
+TAIL_SCAN_BYTES = 64 * 1024
+_PAT_LINE_DAY = re.compile(rb"(\d{4}-\d{2}-\d{2}) \d{2}:\d{2}:\d{2} - ")
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_fd(fd):
+        os.lseek(fd, 0, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError as e:
+                if e.errno not in (errno.EDEADLOCK, errno.EACCES):
+                    raise  # vraie erreur (fd invalide, partage fermé...)
+                # LK_LOCK abandonne après ~10 s d'attente: on réessaie
+
+    def _unlock_fd(fd):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_fd(fd):
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock_fd(fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class _InterProcessLock:
+    """Verrou exclusif entre process (fichier de lock), réentrant et partagé par les threads du process."""
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+        self._depth = 0
+        self._thread_lock = threading.RLock()
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            if self._depth == 0:
+                if self._fd is None:
+                    self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+                _lock_fd(self._fd)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        try:
+            if self._depth == 0:
+                _unlock_fd(self._fd)
+        finally:
+            self._thread_lock.release()
+
+    def close(self):
+        with self._thread_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+def _midnight(date_str):
+    """Epoch du minuit local qui commence le jour 'YYYY-MM-DD'."""
+    return time.mktime(datetime.strptime(date_str, "%Y-%m-%d").timetuple())
+
+
+def _next_midnight(date_str):
+    """Epoch du minuit local qui suit le jour 'YYYY-MM-DD'."""
+    d = datetime.strptime(date_str, "%Y-%m-%d") + timedelta(days=1)
+    return time.mktime(d.timetuple())
+
+
+def _last_line_day(path):
+    """Jour 'YYYY-MM-DD' de la dernière ligne datée du fichier (TAIL_SCAN_BYTES de fin), None sinon."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - TAIL_SCAN_BYTES))
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    for line in reversed(lines):
+        m = _PAT_LINE_DAY.match(line)
+        if m:
+            return m.group(1).decode("ascii")
+    return None
+
+
+def _remove_index(path):
+    """Supprime l'index d'un segment compressé (un .gz n'est pas indexé: pas d'accès aléatoire)."""
+    try:
+        os.remove(path + INDEX_SUFFIX)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Erreur lors de la suppression de {path + INDEX_SUFFIX}: {e}")
+
+
+def _encoded_len(text):
+    """Nb d'octets écrits sur disque pour text (utf-8, newlines du mode texte)."""
+    n = len(text) if text.isascii() else len(text.encode("utf-8", "replace"))
+    return n + text.count("\n") * _NEWLINE_EXTRA
+
 
 class DateBasedFileHandler(logging.Handler):
-    def __init__(self, log_folder, max_bytes):
+    """
+    buffer_records / flush_interval_ms (mode bufferisé, désactivé par défaut):
+      - les lignes formatées sont accumulées en mémoire puis écrites en un seul write()
+      - flush toutes les buffer_records lignes, toutes les flush_interval_ms ms,
+        et immédiatement pour un record >= flush_level (WARNING par défaut)
+      - la taille du fichier (rotation) compte aussi les octets pas encore écrits
+    background_cleanup=True: les suppressions BACKUP_COUNT se font dans un thread de fond.
+    compress=True: chaque segment finalisé (_to_) est compressé en .txt.gz dans ce même
+    thread de fond (suppressions et compressions y sont sérialisées).
+    sidecar=True: en plus du texte, un record binaire par ligne dans log_...txt.rec
+    (voir SIDECAR_RECORD), l'analyse compte alors les events avec NumPy sans relire le texte.
+    Un id par modèle de message (chiffres masqués), la valeur dans payload;
+    extra={"payload": x} sur un appel de log -> x dans le champ payload.
+    multiprocess=True: plusieurs process (UI + watchdog...) sur le même log_folder.
+      - chaque écriture / rotation / cleanup se fait sous un verrou fichier (.log.lock)
+      - le segment courant est partagé via .log_current: un process suit la rotation faite par un autre
+      - aucun fichier n'est gardé ouvert hors verrou (rename possible sous Windows)
+      - la taille est relue sur disque à chaque écriture (les autres process écrivent aussi)
+    rotate_daily=True: rotation aussi au premier record d'un nouveau jour (minuit local),
+    en plus de max_bytes. Chaque segment couvre alors un seul jour et, une fois finalisé,
+    porte toujours sa plage: log_YYYY-MM-DD[(idx)]_to_YYYY-MM-DD.txt (même jour compris).
+    """
+
+    def __init__(self, log_folder, max_bytes, buffer_records=0, flush_interval_ms=None,
+                 flush_level=FLUSH_LEVEL, background_cleanup=False,
+                 compress=False, sidecar=False, multiprocess=False, rotate_daily=False):
+        if sidecar and multiprocess:
+            raise ValueError("sidecar=True n'est pas supporté avec multiprocess=True (ids de messages par process)")
         super().__init__()
         self.log_folder = log_folder
         self.max_bytes = max_bytes
@@ -15,8 +197,72 @@ class DateBasedFileHandler(logging.Handler):
         self.current_log_file = None
         self.current_file_handler = None
         self.backup_count = BACKUP_COUNT
+        self.current_size = 0            # octets du fichier courant (suivi en mémoire)
+        self._writes_since_stat = 0
+
+        # Rotation à minuit (record.created >= _day_end -> nouveau segment)
+        self.rotate_daily = rotate_daily
+        self._day_start = None           # record.created < _day_start (horloge en arrière) -> nouveau segment
+        self._day_end = None
+        self._max_created = None         # record le plus récent écrit par ce process dans le segment courant
+
+        # Mode bufferisé
+        self.buffer_records = buffer_records
+        self.flush_interval_ms = flush_interval_ms
+        self.flush_level = flush_level
+        self.buffered = buffer_records > 1 or bool(flush_interval_ms)
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._buffer_record = None       # dernier record bufferisé (pour handleError)
+        self._last_flush = time.monotonic()
+        self._stop_flusher = threading.Event()
+        self._flusher = None
 
-        self._select_startup_file()  # Nouveau comportement au démarrage
+        # Fichiers conservés, du plus ancien au plus récent: None tant qu'on n'a pas listé le
+        # dossier (démarrage via POINTER_FILE), puis tenu à jour à chaque rotation / suppression.
+        # Rempli dans l'ordre des noms; trié par mtime (os.stat) seulement quand il faut supprimer.
+        self._retained = None
+        self._retained_sorted = False
+        self.compress = compress
+        self._jobs = None
+        self._worker = None
+        if background_cleanup or compress:
+            self._jobs = queue.Queue()
+            self._worker = threading.Thread(target=self._jobs_loop, name="log-maintenance", daemon=True)
+            self._worker.start()
+
+        # Sidecar binaire
+        self.sidecar = sidecar
+        self._sidecar_file = None
+        self._sidecar_buffer = []
+        self._message_ids = {}
+        self._next_message_id = 0
+        self._messages_file = None
+        self._prune_seen = None          # ids utilisés pendant un _prune_message_ids en cours
+        self._last_second = None         # (int(record.created), secondes locales) mémorisé
+        if sidecar:
+            self._load_message_ids()
+            if len(self._message_ids) > MESSAGES_PRUNE_MIN:
+                self._prune_seen = set()
+                if self._jobs is not None:
+                    self._jobs.put((self._prune_message_ids, None))
+                else:
+                    self._prune_message_ids(None)
+
+        self.multiprocess = multiprocess
+        self._process_lock = None
+        if multiprocess:
+            os.makedirs(log_folder, exist_ok=True)
+            self._process_lock = _InterProcessLock(os.path.join(log_folder, LOCK_FILE))
+            with self._process_lock:
+                self._select_startup_file()
+        else:
+            self._select_startup_file()  # Nouveau comportement au démarrage
+
+        # Flush périodique même si plus rien n'est loggé
+        if flush_interval_ms:
+            self._flusher = threading.Thread(target=self._flush_loop, name="log-flusher", daemon=True)
+            self._flusher.start()
 
     def _get_log_filename(self, date_str, index=0):
         suffix = f"({index})" if index > 0 else ""
@@ -30,38 +276,112 @@ class DateBasedFileHandler(logging.Handler):
           - log_YYYY-MM-DD(2).txt
           - log_YYYY-MM-DD_to_YYYY-MM-DD.txt
           - log_YYYY-MM-DD(2)_to_YYYY-MM-DD.txt  (index AVANT _to_)
+          - + .gz pour les segments finalisés compressés
         """
         return re.compile(
-            r"^log_(\d{4}-\d{2}-\d{2})(?:\((\d+)\))?(?:_to_(\d{4}-\d{2}-\d{2}))?\.txt$"
+            r"^log_(\d{4}-\d{2}-\d{2})(?:\((\d+)\))?(?:_to_(\d{4}-\d{2}-\d{2}))?\.txt(?:\.gz)?$"
         )
 
-    def _select_startup_file(self):
-        """Trouve le dernier fichier 'ouvert' existant (sans _to_), continue s’il n’est pas plein. Sinon crée un nouveau fichier."""
+    def _scan_log_files(self):
+        """[(start_date, end_date|None, idx, path)] des logs du dossier (os.scandir, noms seulement: pas de stat)."""
         pattern = self._compiled_pattern()
         files = []
 
         try:
-            for fname in sorted(os.listdir(self.log_folder)):
-                match = pattern.match(fname)
-                if match:
-                    start_date_str = match.group(1)   # date de début
-                    idx_str = match.group(2)          # index éventuel (ex: "2")
-                    end_date_str = match.group(3)     # date de fin (_to_), None si "ouvert"
-                    idx = int(idx_str) if idx_str else 0
-                    path = os.path.join(self.log_folder, fname)
-                    size = os.path.getsize(path)
-                    files.append((start_date_str, end_date_str, idx, path, size))
+            with os.scandir(self.log_folder) as entries:
+                for entry in entries:
+                    match = pattern.match(entry.name)
+                    if match:
+                        start_date_str = match.group(1)   # date de début
+                        idx_str = match.group(2)          # index éventuel (ex: "2")
+                        end_date_str = match.group(3)     # date de fin (_to_), None si "ouvert"
+                        idx = int(idx_str) if idx_str else 0
+                        files.append((start_date_str, end_date_str, idx, entry.path))
         except FileNotFoundError:
             pass
+        return files
+
+    def _load_retained(self, files=None):
+        """Vue des fichiers conservés dans l'ordre des noms (start_date, index); None -> listing du dossier."""
+        if files is None:
+            files = self._scan_log_files()
+        files.sort(key=lambda t: (t[0], t[2], t[1] or "", t[3]))
+        self._retained = OrderedDict((t[3], None) for t in files)
+        self._retained_sorted = False
+
+    def _sort_retained(self):
+        """
+        Trie la vue par mtime (un os.stat par fichier), une fois, quand le nettoyage doit choisir.
+        Le segment courant reste le plus récent même s'il n'existe pas encore (delay=True en multiprocess).
+        """
+        current = self.current_log_file
+
+        def mtime(path):
+            if path == current:
+                return float("inf")
+            for p in (path, path + GZIP_SUFFIX):  # compressé entre-temps: mtime conservé
+                try:
+                    return os.stat(p).st_mtime
+                except FileNotFoundError:
+                    continue
+            return float("-inf")  # déjà disparu: retiré de la vue en premier
 
-        # Fichiers "ouverts" (sans _to_)
-        open_files = [t for t in files if t[1] is None]
+        self._retained = OrderedDict((p, None) for p in sorted(self._retained, key=lambda p: (mtime(p), p)))
+        self._retained_sorted = True
 
-        # ✅ Choisir le dernier ouvert via tri par (start_date, index)
+    def _pointer_segment(self):
+        """(start_date, idx, path) du segment nommé dans POINTER_FILE, None s'il est absent ou inattendu."""
+        name = self._read_pointer()
+        if not name:
+            return None
+        m = self._compiled_pattern().match(name)
+        if not m or m.group(3) is not None or name.endswith(GZIP_SUFFIX):
+            return None  # finalisé / compressé / illisible
+        return m.group(1), (int(m.group(2)) if m.group(2) else 0), os.path.join(self.log_folder, name)
+
+    def _newer_segment_exists(self, start, idx):
+        """Pointeur en retard ? (segment suivant du même jour, ou segment d'aujourd'hui, déjà sur le disque)"""
+        if os.path.exists(self._get_log_filename(start, idx + 1)):
+            return True
+        today = datetime.now().strftime("%Y-%m-%d")
+        return today > start and os.path.exists(self._get_log_filename(today))
+
+    def _startup_candidate(self):
+        """
+        (start_date, idx, path, size) du dernier fichier 'ouvert', ou None.
+        D'abord POINTER_FILE (quelques stat, sans lister le dossier); s'il ne correspond plus
+        au disque: os.scandir, et stat seulement des fichiers ouverts, du plus récent au plus ancien.
+        """
+        pointed = self._pointer_segment()
+        if pointed is not None and not self._newer_segment_exists(pointed[0], pointed[1]):
+            try:
+                return pointed + (os.stat(pointed[2]).st_size,)
+            except FileNotFoundError:
+                pass  # renommé / supprimé depuis l'écriture du pointeur
+
+        files = self._scan_log_files()
+        self._load_retained(files)
+
+        # Fichiers "ouverts" (sans _to_), ✅ le dernier via tri par (start_date, index)
+        open_files = [t for t in files if t[1] is None and not t[3].endswith(GZIP_SUFFIX)]
         open_files.sort(key=lambda t: (t[0], t[2]))
+        for start, _, idx, path in reversed(open_files):
+            try:
+                return start, idx, path, os.stat(path).st_size
+            except FileNotFoundError:
+                continue  # supprimé entre-temps (autre process / thread de fond)
+        return None
+
+    def _select_startup_file(self):
+        """Trouve le dernier fichier 'ouvert' existant (sans _to_), continue s’il n’est pas plein. Sinon crée un nouveau fichier."""
+        candidate = self._startup_candidate()
+
+        # Segments finalisés restés en .txt (arrêt avant la fin de la compression): listés en fond
+        if self.compress:
+            self._jobs.put((self._compress_leftovers, self.log_folder))
 
-        if open_files:
-            last_start, _, last_idx, last_path, last_size = open_files[-1]
+        if candidate:
+            last_start, last_idx, last_path, last_size = candidate
             if last_size < self.max_bytes:
                 # Continuer le dernier fichier non plein
                 self.base_date = last_start
@@ -83,20 +403,47 @@ class DateBasedFileHandler(logging.Handler):
             self.base_date = datetime.now().strftime("%Y-%m-%d")
             self.current_index = 0
 
+        if self._retained is None:
+            self._load_retained()  # nouveau fichier: le nettoyage a besoin de la vue
         self.current_log_file = self._get_log_filename(self.base_date, self.current_index)
         self._create_log_file(self.current_log_file)
 
     def _create_log_file(self, filepath):
         if self.current_file_handler:
+            self._flush_buffer()
             self.current_file_handler.close()
 
         os.makedirs(self.log_folder, exist_ok=True)
-        self.current_file_handler = logging.FileHandler(filepath, mode="a", encoding="utf-8")
+        # multiprocess: pas de stream ouvert en permanence (delay), on ouvre/ferme à chaque écriture
+        self.current_file_handler = logging.FileHandler(filepath, mode="a", encoding="utf-8",
+                                                        delay=self.multiprocess)
         self.current_file_handler.setFormatter(logging.Formatter(
             "%(asctime)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
         ))
+        self.current_size = self._stat_current_size()
+        self._writes_since_stat = 0
+        self._day_start = _midnight(self.base_date)
+        self._day_end = _next_midnight(self.base_date)
+        self._max_created = None
+        if self.sidecar:
+            self._open_sidecar(filepath)
+        # Démarrage suivant: segment courant sans lister le dossier
+        self._write_pointer(filepath)
+        if self.multiprocess:
+            # d'autres process ont pu créer / renommer / supprimer des fichiers: vue relue (rare)
+            self._load_retained()
 
-        self._cleanup_old_logs()
+        if self._retained is not None:
+            if filepath not in self._retained:
+                self._retained[filepath] = None  # nouveau fichier = le plus récent
+            self._cleanup_old_logs()
+
+    def _stat_current_size(self):
+        """Taille réelle du fichier courant sur disque (0 si absent)."""
+        try:
+            return os.path.getsize(self.current_file_handler.baseFilename)
+        except FileNotFoundError:
+            return 0
 
     ################### V2 #######################
     def _finalize_current_file(self, end_date_str: str):
@@ -105,10 +452,14 @@ class DateBasedFileHandler(logging.Handler):
         Formats :
           - même jour  : log_YYYY-MM-DD[(idx)].txt                         (pas de _to_)
           - jours diff : log_YYYY-MM-DD[(idx)]_to_YYYY-MM-DD.txt           (index AVANT _to_)
+          - rotate_daily : toujours _to_ (la plage du nom est exacte pour les analyseurs)
         """
         if not self.current_file_handler:
             return
 
+        # Les lignes en attente appartiennent au fichier qu'on ferme
+        self._flush_buffer()
+
         old_path = self.current_file_handler.baseFilename
         fname = os.path.basename(old_path)
 
@@ -124,87 +475,609 @@ class DateBasedFileHandler(logging.Handler):
         idx_str = m.group(2)
         idx_suffix = f"({idx_str})" if idx_str else ""
 
+        self._close_sidecar()
+
         # Même jour → on NE CHANGE PAS le nom (pas de _to_)
-        if end_date_str == start_date_str:
+        if end_date_str == start_date_str and not self.rotate_daily:
             self.current_file_handler.close()
             self.current_file_handler = None
             self.current_log_file = old_path
+            if self._retained is not None and old_path in self._retained:
+                self._retained.move_to_end(old_path)  # écrit jusqu'ici -> le plus récent
             return
 
         # Jours différents → index AVANT _to_
         new_name = f"log_{start_date_str}{idx_suffix}_to_{end_date_str}.txt"
         new_path = os.path.join(self.log_folder, new_name)
+        # Jamais d'os.replace sur un segment existant (horloge revenue en arrière): index suivant libre
+        idx = int(idx_str) if idx_str else 0
+        while os.path.exists(new_path) or os.path.exists(new_path + GZIP_SUFFIX):
+            idx += 1
+            new_path = os.path.join(self.log_folder, f"log_{start_date_str}({idx})_to_{end_date_str}.txt")
 
         try:
             self.current_file_handler.close()
             os.replace(old_path, new_path)
+            for suffix in (SIDECAR_SUFFIX, INDEX_SUFFIX):
+                if os.path.exists(old_path + suffix):
+                    os.replace(old_path + suffix, new_path + suffix)
             self.current_log_file = new_path
+            if self._retained is not None:
+                self._retained.pop(old_path, None)
+                self._retained[new_path] = None
+            if self.compress:
+                self._jobs.put((self._compress_log, new_path))
         finally:
             self.current_file_handler = None
 
-    def emit(self, record):
-        # ✅ Vérification robuste de la taille réelle (>=)
-        if self.current_file_handler:
-            try:
-                current_size = os.path.getsize(self.current_file_handler.baseFilename)
-            except FileNotFoundError:
-                current_size = 0
+    def _rotate(self, today=None):
+        if today is None:
+            today = datetime.now().strftime("%Y-%m-%d")
 
-            if current_size >= self.max_bytes:
-                today = datetime.now().strftime("%Y-%m-%d")
+        # Finaliser l'ancien fichier AVANT d'ouvrir le nouveau
+        if self._retained is None:
+            self._load_retained()  # 1re rotation après un démarrage via POINTER_FILE
+        self._finalize_current_file(self._segment_end_date())
 
-                # Finaliser l'ancien fichier AVANT d'ouvrir le nouveau
-                self._finalize_current_file(today)
+        # Nouveau segment : même jour → index+1 ; autre jour → index=0
+        # (horloge revenue en arrière: segment au jour réel du record, sur un index libre)
+        if today != self.base_date:
+            self.base_date = today
+            self.current_index = 0
+        else:
+            self.current_index += 1
+        # ... sans reprendre un segment déjà présent (écrit par un autre run / avant le recul d'horloge)
+        while os.path.exists(self._get_log_filename(self.base_date, self.current_index)):
+            self.current_index += 1
 
-                # Nouveau segment : même jour → index+1 ; autre jour → index=0
-                if today != self.base_date:
-                    self.base_date = today
-                    self.current_index = 0
-                else:
-                    self.current_index += 1
+        self.current_log_file = self._get_log_filename(self.base_date, self.current_index)
+        self._create_log_file(self.current_log_file)
 
-                self.current_log_file = self._get_log_filename(self.base_date, self.current_index)
-                self._create_log_file(self.current_log_file)
+    def _segment_end_date(self):
+        """
+        Date de fin du segment courant = jour de la dernière ligne écrite, pas l'horloge:
+        record le plus récent de ce process, et dernière ligne du fichier si d'autres ont pu
+        y écrire (multiprocess, segment repris d'un run précédent). Jamais avant base_date.
+        """
+        end_date = self.base_date
+        if self._max_created is not None:
+            end_date = max(end_date, time.strftime("%Y-%m-%d", time.localtime(self._max_created)))
+        if self.current_file_handler and (self.multiprocess or self._max_created is None):
+            end_date = max(end_date, _last_line_day(self.current_file_handler.baseFilename) or end_date)
+        return end_date
+
+    def _needs_rotation(self, record):
+        """None, ou le jour du nouveau segment ('' -> jour courant) si on doit tourner avant record."""
+        if record.created < self._day_start:
+            # horloge revenue en arrière: les lignes d'un segment ne précèdent jamais son nom
+            return time.strftime("%Y-%m-%d", time.localtime(record.created))
+        if self.rotate_daily and record.created >= self._day_end:
+            return time.strftime("%Y-%m-%d", time.localtime(record.created))
+        if self.current_size >= self.max_bytes:
+            return time.strftime("%Y-%m-%d", time.localtime(record.created)) if self.rotate_daily else ""
+        return None
+
+    def emit(self, record):
+        if self.multiprocess:
+            self._emit_shared(record)
+            return
+
+        # ✅ Taille suivie en mémoire (>=), re-stat seulement de temps en temps
+        if self.current_file_handler:
+            if self._writes_since_stat >= SIZE_RESYNC_EVERY:
+                self.current_size = self._stat_current_size() + self._buffer_bytes
+                self._writes_since_stat = 0
+
+            new_day = self._needs_rotation(record)
+            if new_day is not None:
+                self._rotate(new_day or None)
 
         # Créer un fichier si, pour une raison X, le handler a été finalisé
         if not self.current_file_handler:
             self.current_log_file = self._get_log_filename(self.base_date, self.current_index)
             self._create_log_file(self.current_log_file)
 
-        # Écriture réelle
-        self.current_file_handler.emit(record)
+        # Écriture réelle (formatage une seule fois: on connaît la taille écrite)
+        handler = self.current_file_handler
+        if self.buffered:
+            try:
+                msg = handler.format(record) + handler.terminator
+            except RecursionError:
+                raise
+            except Exception:
+                handler.handleError(record)
+                return
+            size = _encoded_len(msg)
+            self._buffer.append(msg)
+            self._buffer_bytes += size
+            self._buffer_record = record
+            if self._sidecar_file is not None:
+                self._sidecar_buffer.append(self._sidecar_record(record))
+            self.current_size += size
+            self._writes_since_stat += 1
+            if self._max_created is None or record.created > self._max_created:
+                self._max_created = record.created
+            if (record.levelno >= self.flush_level
+                    or (self.buffer_records and len(self._buffer) >= self.buffer_records)
+                    or (self.flush_interval_ms
+                        and time.monotonic() - self._last_flush >= self.flush_interval_ms / 1000)):
+                self._flush_buffer()
+            return
+
+        try:
+            msg = handler.format(record) + handler.terminator
+            handler.stream.write(msg)
+            handler.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            handler.handleError(record)
+            return
+        self.current_size += _encoded_len(msg)
+        self._writes_since_stat += 1
+        if self._max_created is None or record.created > self._max_created:
+            self._max_created = record.created
+        if self._sidecar_file is not None:
+            self._write_sidecar(self._sidecar_record(record))
 
-    def _cleanup_old_logs(self):
-        """Supprime les plus vieux fichiers de log si on dépasse le BACKUP_COUNT."""
-        pattern = self._compiled_pattern()
-        all_logs = []
+    def _emit_shared(self, record):
+        """emit() du mode multiprocess: formatage (et buffer) hors verrou, écriture via _write_shared."""
+        handler = self.current_file_handler
+        try:
+            msg = handler.format(record) + handler.terminator
+        except RecursionError:
+            raise
+        except Exception:
+            handler.handleError(record)
+            return
+        if not self.buffered:
+            self._write_shared((msg,), record)
+            return
+        self._buffer.append(msg)
+        self._buffer_record = record
+        if (record.levelno >= self.flush_level
+                or (self.buffer_records and len(self._buffer) >= self.buffer_records)
+                or (self.flush_interval_ms
+                    and time.monotonic() - self._last_flush >= self.flush_interval_ms / 1000)):
+            self._flush_buffer()
+
+    def _write_shared(self, msgs, record):
+        """
+        Sous le verrou: suit le segment courant choisi par les autres process, puis append
+        des lignes msgs. Comme en mono-process, la rotation est vérifiée avant chaque ligne
+        (taille relue sur disque + lignes du buffer déjà placées): un flush peut tourner en cours de route.
+        """
+        try:
+            with self._process_lock:
+                self._adopt_shared_segment()
+                self.current_size = self._stat_current_size()
+                chunk = []
+                for msg in msgs:
+                    new_day = self._needs_rotation(record)
+                    if new_day is not None:
+                        self._append_shared(chunk, record)
+                        chunk = []
+                        self._rotate(new_day or None)
+                    chunk.append(msg)
+                    self.current_size += _encoded_len(msg)
+                self._append_shared(chunk, record)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _append_shared(self, chunk, record):
+        """Append (un seul write) de chunk au segment courant, fichier refermé aussitôt (sous le verrou)."""
+        if not chunk:
+            return
+        with open(self.current_file_handler.baseFilename, "a", encoding="utf-8") as f:
+            f.write("".join(chunk))
+        if self._max_created is None or record.created > self._max_created:
+            self._max_created = record.created
 
+    def _read_pointer(self):
         try:
-            for fname in os.listdir(self.log_folder):
-                match = pattern.match(fname)
-                if match:
-                    path = os.path.join(self.log_folder, fname)
-                    mtime = os.path.getmtime(path)
-                    all_logs.append((mtime, path))
+            with open(os.path.join(self.log_folder, POINTER_FILE), "r", encoding="utf-8") as f:
+                return f.read().strip()
         except FileNotFoundError:
+            return None
+
+    def _write_pointer(self, filepath):
+        """
+        Écriture atomique (temp + os.replace): un lecteur ne voit jamais un pointeur vide ou tronqué.
+        Best-effort: le pointeur n'est qu'un indice vérifié au démarrage, un échec (fichier tenu
+        ouvert par l'antivirus / l'indexeur sous Windows, dossier en lecture seule) ne bloque pas le log.
+        """
+        path = os.path.join(self.log_folder, POINTER_FILE)
+        tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(os.path.basename(filepath))
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _adopt_shared_segment(self):
+        """Un autre process a tourné: on reprend son segment courant (nom dans .log_current)."""
+        pointed = self._pointer_segment()
+        if pointed is None or os.path.basename(pointed[2]) == os.path.basename(self.current_file_handler.baseFilename):
+            return  # pointeur inattendu / inchangé: on garde notre segment
+        self.base_date, self.current_index, self.current_log_file = pointed
+        self._create_log_file(self.current_log_file)
+
+    def _flush_buffer(self):
+        """Écrit les lignes bufferisées en un seul write() + flush() sur le fichier courant."""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        record = self._buffer_record
+        if self.multiprocess:
+            msgs = self._buffer
+            self._buffer = []
+            self._buffer_record = None
+            self._write_shared(msgs, record)
+            return
+
+        data = "".join(self._buffer)
+        nbytes = self._buffer_bytes
+        self._buffer.clear()
+        self._buffer_bytes = 0
+        self._buffer_record = None
+
+        handler = self.current_file_handler
+        if handler is None:
+            self.current_size -= nbytes
+            return
+        try:
+            handler.stream.write(data)
+            handler.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.current_size -= nbytes  # rien (ou pas tout) n'est écrit: re-stat au prochain contrôle
+            self._sidecar_buffer.clear()
+            handler.handleError(record)
+            return
+        if self._sidecar_buffer:
+            data = b"".join(self._sidecar_buffer)
+            self._sidecar_buffer.clear()
+            self._write_sidecar(data)
+
+    def _load_message_ids(self):
+        """Recharge la table message -> id (les ids déjà attribués ne changent jamais)."""
+        try:
+            with open(os.path.join(self.log_folder, MESSAGES_FILE), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        msg_id, text = json.loads(line)
+                    except ValueError:
+                        continue  # ligne tronquée (arrêt brutal)
+                    self._message_ids[text] = msg_id
+                    self._next_message_id = max(self._next_message_id, msg_id + 1)
+        except FileNotFoundError:
+            pass
+
+    def _prune_message_ids(self, _path):
+        """
+        Job: réécrit MESSAGES_FILE sans les ids qui n'apparaissent dans aucun .rec du dossier
+        (segments supprimés). Les ids gardés ne changent pas, un id retiré n'est jamais réattribué.
+        """
+        first_new = self._next_message_id
+        used = set()
+        try:
+            names = os.listdir(self.log_folder)
+        except OSError:
+            names = []
+        for name in names:
+            if not name.endswith(SIDECAR_SUFFIX):
+                continue
+            try:
+                with open(os.path.join(self.log_folder, name), "rb") as f:
+                    data = f.read()
+            except OSError:
+                continue
+            data = data[:len(data) - len(data) % SIDECAR_RECORD.size]
+            used.update(msg_id for _, msg_id, _ in SIDECAR_RECORD.iter_unpack(data))
+
+        with self.lock:
+            seen, self._prune_seen = self._prune_seen, None
+            keep = {text: msg_id for text, msg_id in self._message_ids.items()
+                    if msg_id in used or msg_id in seen or msg_id >= first_new}
+            if len(keep) == len(self._message_ids):
+                return
+            path = os.path.join(self.log_folder, MESSAGES_FILE)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for text, msg_id in sorted(keep.items(), key=lambda item: item[1]):
+                        f.write(json.dumps([msg_id, text], ensure_ascii=False) + "\n")
+                if self._messages_file is not None:
+                    self._messages_file.close()
+                    self._messages_file = None  # rouvert au prochain nouvel id
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Erreur lors du nettoyage de {MESSAGES_FILE}: {e}")
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                return
+            self._message_ids = keep
+
+    def _message_id(self, text):
+        msg_id = self._message_ids.get(text)
+        if msg_id is not None:
+            if self._prune_seen is not None:
+                self._prune_seen.add(msg_id)
+            return msg_id
+        if len(self._message_ids) >= MAX_MESSAGE_IDS:
+            return -1
+        msg_id = self._next_message_id
+        if self._messages_file is None:
+            self._messages_file = open(os.path.join(self.log_folder, MESSAGES_FILE), "a", encoding="utf-8")
+        # Écrit (et flush) AVANT le premier record qui utilise l'id
+        self._messages_file.write(json.dumps([msg_id, text], ensure_ascii=False) + "\n")
+        self._messages_file.flush()
+        self._message_ids[text] = msg_id
+        self._next_message_id += 1
+        return msg_id
+
+    def _sidecar_record(self, record):
+        """
+        Record binaire d'une ligne: même seconde que le texte (asctime), id du modèle de la
+        1re ligne (chiffres masqués), payload = extra payload sinon premier nombre du texte.
+        """
+        created = int(record.created)
+        if self._last_second is None or self._last_second[0] != created:
+            self._last_second = (created, calendar.timegm(time.localtime(created)))
+        text = record.message if hasattr(record, "message") else record.getMessage()
+        m = _LINE_BREAK.search(text)
+        if m:
+            text = text[:m.start()]  # lignes suivantes: sans timestamp, ignorées par l'analyse
+        payload = getattr(record, "payload", None)
+        if payload is None:
+            m = _NUMBER.search(text)
+            payload = m.group() if m else None
+        try:
+            payload = float(payload) if payload is not None else float("nan")
+        except (TypeError, ValueError):
+            payload = float("nan")
+        template = _DIGITS.sub(MESSAGE_NUMBER_MARK, text)
+        return SIDECAR_RECORD.pack(self._last_second[1], self._message_id(template), payload)
+
+    def _open_sidecar(self, filepath):
+        # Un fichier texte déjà commencé reste sans sidecar, sauf si son .rec le couvre en entier:
+        # dernier record = SIDECAR_SIZE_MARK avec la taille actuelle du .txt (rien écrit sans .rec depuis)
+        self._close_sidecar()
+        side_path = filepath + SIDECAR_SUFFIX
+        if self.current_size == 0:
+            self._sidecar_file = open(side_path, "wb")
             return
+        try:
+            with open(side_path, "rb") as f:
+                f.seek(-SIDECAR_RECORD.size, os.SEEK_END)
+                size, msg_id, _ = SIDECAR_RECORD.unpack(f.read(SIDECAR_RECORD.size))
+        except (OSError, struct.error):
+            return
+        if msg_id == SIDECAR_SIZE_MARK and size == os.path.getsize(filepath):
+            self._sidecar_file = open(side_path, "ab")
+
+    def _write_sidecar(self, data):
+        # Toujours APRÈS le texte: sidecar au moins aussi récent (mtime) que le .txt qu'il décrit
+        try:
+            self._sidecar_file.write(data)
+            self._sidecar_file.flush()
+        except Exception as e:
+            print(f"Erreur d'écriture du sidecar {self._sidecar_file.name}: {e}")
+            self._close_sidecar(covered=False)
+
+    def _close_sidecar(self, covered=True):
+        if self._sidecar_file is not None:
+            try:
+                if covered:
+                    # taille du .txt couverte (buffer déjà écrit): ce .rec pourra être repris au prochain run
+                    text_size = os.path.getsize(self._sidecar_file.name[:-len(SIDECAR_SUFFIX)])
+                    self._sidecar_file.write(SIDECAR_RECORD.pack(text_size, SIDECAR_SIZE_MARK, float("nan")))
+                self._sidecar_file.close()
+            except OSError:
+                pass
+            self._sidecar_file = None
+
+    def _flush_loop(self):
+        interval = self.flush_interval_ms / 1000
+        while not self._stop_flusher.wait(interval):
+            self.flush()
+
+    def flush(self):
+        # Appelé aussi par logging.shutdown() à la sortie du programme
+        with self.lock:
+            self._flush_buffer()
+
+    def _cleanup_old_logs(self):
+        """Supprime les plus vieux fichiers de log si on dépasse le BACKUP_COUNT (vue en mémoire, sans listdir)."""
+        if len(self._retained) > self.backup_count and not self._retained_sorted:
+            self._sort_retained()
+        while len(self._retained) > self.backup_count:
+            oldest_path, _ = self._retained.popitem(last=False)
+            if oldest_path == self.current_log_file:
+                self._retained[oldest_path] = None  # jamais le segment en cours d'écriture
+                if len(self._retained) == 1:
+                    break
+                continue
+            if self._jobs is not None:
+                self._jobs.put((self._remove_log, oldest_path))
+            else:
+                self._remove_log(oldest_path)
 
-        all_logs.sort()  # plus anciens en premier
+    def _maintenance_lock(self):
+        """Verrou inter-process (multiprocess) pour les jobs qui suppriment / remplacent des segments."""
+        return self._process_lock if self._process_lock is not None else contextlib.nullcontext()
 
-        while len(all_logs) > self.backup_count:
-            _, oldest_path = all_logs.pop(0)
+    def _remove_log(self, path):
+        with self._maintenance_lock():
+            self._remove_log_files(path)
+
+    def _remove_log_files(self, path):
+        # Le segment a pu être compressé depuis son entrée dans la vue (.txt -> .txt.gz)
+        txt_path = path[:-len(GZIP_SUFFIX)] if path.endswith(GZIP_SUFFIX) else path
+        # .rec: peut rester d'un run avec sidecar=True; .idx: écrit par l'analyse
+        paths = [txt_path, txt_path + SIDECAR_SUFFIX, txt_path + INDEX_SUFFIX]
+        # .gz: déjà dans la vue (run précédent avec compress=True) ou compressé depuis; sans
+        # compression, rien à chercher -> un unlink raté de moins par segment supprimé
+        if self.compress or path != txt_path:
+            paths.append(txt_path + GZIP_SUFFIX)
+        for p in paths:
             try:
-                os.remove(oldest_path)
+                os.remove(p)
+            except FileNotFoundError:
+                pass  # déjà supprimé (à la main) / pas (encore) compressé
             except Exception as e:
-                print(f"Erreur lors de la suppression de {oldest_path}: {e}")
+                print(f"Erreur lors de la suppression de {p}: {e}")
+
+    def _compress_log(self, path):
+        """path -> path.gz (fichier temporaire + os.replace, mtime conservé), puis supprime path et son .idx."""
+        gz_path = path + GZIP_SUFFIX
+        # Temporaire propre au process / thread: deux process peuvent traiter le même segment
+        tmp_path = f"{gz_path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        try:
+            if os.path.exists(gz_path):
+                # Déjà compressé (autre process / run précédent): le .gz est complet (os.replace)
+                with self._maintenance_lock():
+                    os.remove(path)
+                    _remove_index(path)
+                return
+            # Compression hors verrou (longue), seul le remplacement se fait sous le verrou
+            st = os.stat(path)
+            with open(path, "rb") as fi, gzip.open(tmp_path, "wb", compresslevel=COMPRESS_LEVEL) as fo:
+                shutil.copyfileobj(fi, fo, 1024 * 1024)
+            os.utime(tmp_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+            with self._maintenance_lock():
+                if os.path.exists(gz_path) or not os.path.exists(path):
+                    os.remove(tmp_path)  # compressé / supprimé par un autre process entre-temps
+                    return
+                os.replace(tmp_path, gz_path)
+                os.remove(path)
+                _remove_index(path)
+        except FileNotFoundError:
+            pass  # supprimé entre-temps (BACKUP_COUNT)
+        except Exception as e:
+            print(f"Erreur lors de la compression de {path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _compress_leftovers(self, folder):
+        """Job de fond au démarrage: compresse les segments finalisés (_to_) encore en .txt."""
+        for _, end_date_str, _, path in self._scan_log_files():
+            if end_date_str is not None and not path.endswith(GZIP_SUFFIX):
+                self._compress_log(path)
+
+    def _jobs_loop(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            func, path = job
+            func(path)
 
     def close(self):
-        if self.current_file_handler:
-            self.current_file_handler.close()
+        if self._flusher is not None:
+            self._stop_flusher.set()
+            self._flusher.join()
+            self._flusher = None
+        with self.lock:
+            self._flush_buffer()
+            if self.current_file_handler:
+                self.current_file_handler.close()
+            self._close_sidecar()
+            if self._messages_file is not None:
+                self._messages_file.close()
+                self._messages_file = None
+        if self._worker is not None:
+            self._jobs.put(None)  # termine les suppressions / compressions en attente
+            self._worker.join()
+            self._worker = None
+        if self._process_lock is not None:
+            self._process_lock.close()  # après les jobs: ils prennent encore le verrou
         super().close()
 
 
-def get_logger():
+class _BlockingSentinelListener(QueueListener):
+    """QueueListener dont le sentinel d'arrêt attend une place (queue bornée pleine)."""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class AsyncDateBasedFileHandler(QueueHandler):
+    """
+    Variante non bloquante pour le thread UI:
+      - emit() ne fait que mettre le record dans une queue bornée
+      - un thread de fond possède le DateBasedFileHandler (écriture, rotation, cleanup)
+      - overflow="block": on attend une place / overflow="drop": record jeté + compteur
+      - flush à la sortie du programme (atexit) ou via close()
+    """
+
+    def __init__(self, log_folder, max_bytes, queue_size=10000, overflow="block", **handler_kwargs):
+        if overflow not in ("block", "drop"):
+            raise ValueError(f"overflow invalide: {overflow!r} (attendu: 'block' ou 'drop')")
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.overflow = overflow
+        self.dropped = 0
+        self.date_handler = DateBasedFileHandler(log_folder, max_bytes, **handler_kwargs)
+        self._listener = _BlockingSentinelListener(self.queue, self.date_handler)
+        self._listener.start()
+        atexit.register(self.close)
+
+    def enqueue(self, record):
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stats(self):
+        """Etat de la queue: profondeur actuelle, taille max et nb de records jetés."""
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "dropped": self.dropped,
+        }
+
+    def close(self):
+        # Vide la queue (le thread écrit tout ce qui reste) puis ferme le fichier
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+            self.date_handler.close()
+            atexit.unregister(self.close)
+        super().close()
+
+
+def get_logger(async_mode=False, queue_size=10000, overflow="block",
+               buffer_records=0, flush_interval_ms=None, background_cleanup=False,
+               compress=False, sidecar=False, multiprocess=False, rotate_daily=False):
+    """
+    async_mode=True: écriture par un thread de fond (AsyncDateBasedFileHandler),
+    le thread appelant (UI, serial) ne touche jamais au disque.
+    buffer_records / flush_interval_ms: mode bufferisé (voir DateBasedFileHandler),
+    moins de petits write+flush sur les cartes SD / SSD bas de gamme.
+    background_cleanup=True: suppression des vieux fichiers hors du thread qui logge.
+    compress=True: segments finalisés archivés en .txt.gz (en arrière-plan).
+    sidecar=True: records binaires log_...txt.rec en plus du texte (analyse NumPy).
+    multiprocess=True: plusieurs process peuvent logger dans le même LOG_FOLDER (verrou fichier).
+    rotate_daily=True: un segment par jour au plus (en plus de la limite de taille).
+    """
+    handler_kwargs = {"buffer_records": buffer_records, "flush_interval_ms": flush_interval_ms,
+                      "background_cleanup": background_cleanup, "compress": compress,
+                      "sidecar": sidecar, "multiprocess": multiprocess,
+                      "rotate_daily": rotate_daily}
     os.makedirs(LOG_FOLDER, exist_ok=True)
 
     logger = logging.getLogger("date_logger")
@@ -212,7 +1085,12 @@ def get_logger():
 
     # Éviter multiples handlers si déjà configuré
     if not logger.handlers:
-        date_handler = DateBasedFileHandler(LOG_FOLDER, MAX_SIZE_PER_LOG_FILE)
+        if async_mode:
+            date_handler = AsyncDateBasedFileHandler(LOG_FOLDER, MAX_SIZE_PER_LOG_FILE,
+                                                     queue_size=queue_size, overflow=overflow,
+                                                     **handler_kwargs)
+        else:
+            date_handler = DateBasedFileHandler(LOG_FOLDER, MAX_SIZE_PER_LOG_FILE, **handler_kwargs)
         logger.addHandler(date_handler)
 
     return logger
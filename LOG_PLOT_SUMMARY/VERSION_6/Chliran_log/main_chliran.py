@@ -9,20 +9,25 @@ from datetime import datetime
 from parse_dt_utils import parse_dt
 from data_frame import build_df_cycles, build_df_resume, export_excel, write_summary
 from CONST_n_PLOT import plot_resume, save_plot, ADVANCED_THRESHOLD_S, SW_LIST
+# log_seek.py: dossier parent (VERSION_6), résolu par le loader du GUI (generic_log_analysis)
+from log_seek import open_log_from, file_overlaps
 
 PAT_SPLIT_LINE = re.compile(r"^(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\s*-\s*(.+)$")
 
 
-PAT_FILE_RANGE = re.compile(r"log_(\d{4}-\d{2}-\d{2})_to_(\d{4}-\d{2}-\d{2})\.txt$", re.IGNORECASE)
+PAT_FILE_RANGE = re.compile(r"log_(\d{4}-\d{2}-\d{2})(?:\(\d+\))?(?:_to_(\d{4}-\d{2}-\d{2}))?\.txt(?:\.gz)?$", re.IGNORECASE)
 
 def _file_date_range(path: Path):
-    """Return (start_date, end_date) from filename 'log_YYYY-MM-DD_to_YYYY-MM-DD.txt' if possible."""
+    """
+    Return (start_date, end_date) from filename 'log_YYYY-MM-DD[(n)]_to_YYYY-MM-DD.txt[.gz]' if possible.
+    Open segment 'log_YYYY-MM-DD[(n)].txt' -> (start_date, None): only the lower bound is known.
+    """
     m = PAT_FILE_RANGE.search(path.name)
     if not m:
         return None, None
     try:
         a = datetime.strptime(m.group(1), "%Y-%m-%d").date()
-        b = datetime.strptime(m.group(2), "%Y-%m-%d").date()
+        b = datetime.strptime(m.group(2), "%Y-%m-%d").date() if m.group(2) else None
         return a, b
     except Exception:
         return None, None
@@ -49,7 +54,9 @@ def _iter_split_files(split_path):
     for item in items:
         p = Path(item)
         if p.is_dir():
-            files.extend(sorted(p.glob("*.txt")))
+            # .txt.gz = segment archivé (ignoré si la version .txt est encore là)
+            archived = [q for q in p.glob("*.txt.gz") if not q.with_suffix("").exists()]
+            files.extend(sorted(list(p.glob("*.txt")) + archived))
         elif p.is_file():
             files.append(p)
         else:
@@ -89,6 +96,8 @@ def analyze_chliran(split_path, start_dt, end_dt, mode="run", output_path="", pr
       - Skip des fichiers .txt hors intervalle (via nom log_YYYY-MM-DD_to_YYYY-MM-DD.txt)
       - Break dès que dt > end_dt (si le fichier est chronologique)
       - Parsing datetime rapide (datetime.strptime sur les 19 premiers chars)
+      - Index sidecar par heure (log_seek): skip fichier + seek direct sur start_dt
+      - Segments archivés .txt.gz lus en streaming (décompression à la volée)
     """
     start_ts = parse_dt(start_dt, "start_dt")
     end_ts = parse_dt(end_dt, "end_dt")
@@ -108,11 +117,16 @@ def analyze_chliran(split_path, start_dt, end_dt, mode="run", output_path="", pr
     for fpath in split_files:
         # Skip fichier si son nom indique qu'il ne chevauche pas l'intervalle
         f_start, f_end = _file_date_range(Path(fpath))
-        if f_start and f_end:
-            if f_end < start_py.date() or f_start > end_py.date():
-                continue
-
-        with open(fpath, "r", encoding="utf-8", errors="ignore") as f:
+        if f_start and f_start > end_py.date():
+            continue
+        if f_end and f_end < start_py.date():
+            continue
+        # Skip fichier si son index sidecar (min/max) est hors intervalle
+        if not file_overlaps(fpath, start_py, end_py):
+            continue
+
+        # Seek direct sur start_dt (dichotomie, fallback linéaire si non chronologique)
+        with open_log_from(fpath, start_py, errors="ignore") as f:
             for line in f:
                 line = line.strip()
                 if not line:
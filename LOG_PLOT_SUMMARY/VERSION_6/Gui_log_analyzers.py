@@ -7,13 +7,9 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
+import threading
 from datetime import datetime
 
-import matplotlib
-matplotlib.use("TkAgg")
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-
 import generic_log_analysis as glan
 
 lst_project = [
@@ -26,6 +22,39 @@ lst_project = [
     "Pendulum",
 ]
 
+# Nb max de process pour une analyse (projets classiques); le pool n'est lancé qu'au-delà
+# de glan.PARALLEL_MIN_BYTES de logs sélectionnés, sinon analyse séquentielle
+ANALYSIS_WORKERS = os.cpu_count() or 1
+
+
+_mpl_lock = threading.Lock()
+_mpl_backend_set = False
+
+
+def _load_matplotlib():
+    """
+    Import de matplotlib (backend Tk) à la demande: la fenêtre s'ouvre sans attendre
+    numpy / matplotlib. Retourne (pyplot, FigureCanvasTkAgg).
+    """
+    global _mpl_backend_set
+    with _mpl_lock:
+        if not _mpl_backend_set:
+            import matplotlib
+            matplotlib.use("TkAgg")
+            _mpl_backend_set = True
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    return plt, FigureCanvasTkAgg
+
+
+def _warm_up_heavy_imports():
+    """Thread de fond: précharge numpy + matplotlib pendant que l'utilisateur remplit le formulaire."""
+    try:
+        import numpy  # noqa: F401
+        _load_matplotlib()
+    except Exception:
+        pass  # l'erreur éventuelle réapparaîtra au premier run
+
 
 class LogAnalyzerGUI:
     def __init__(self, root):
@@ -100,7 +129,7 @@ class LogAnalyzerGUI:
     def browse_file(self):
         paths = filedialog.askopenfilenames(
             title="Select log file(s)",
-            filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")]
+            filetypes=[("Text Files", "*.txt *.txt.gz"), ("All Files", "*.*")]
         )
         if paths:
             self.log_file_paths = list(paths)
@@ -140,13 +169,16 @@ class LogAnalyzerGUI:
 
         # === Dispatcher : gère aussi Pendulum/Chliran ===
         try:
+            _load_matplotlib()  # backend Tk choisi avant tout import de pyplot
             result, fig = glan.run_analysis_dispatch(
                 files=self.log_file_paths,
                 start_dt=start_dt,
                 end_dt=end_dt,
                 interval=self.interval.get(),
                 event_config=event_config,
-                project_name=proj
+                project_name=proj,
+                workers=ANALYSIS_WORKERS,
+                cache_dir=glan.ANALYSIS_CACHE_DIR
             )
         except Exception as e:
             messagebox.showerror("Error", f"Error during analysis: {e}")
@@ -171,6 +203,7 @@ class LogAnalyzerGUI:
 
         self.save_button.state(["!disabled"])
     def handle_plot_result(self, fig):
+        plt, FigureCanvasTkAgg = _load_matplotlib()
         if fig is None:
             if plt.get_fignums():
                 fig = plt.gcf()
@@ -188,6 +221,7 @@ class LogAnalyzerGUI:
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
     def try_show_current_matplotlib(self):
+        plt, _ = _load_matplotlib()
         if plt.get_fignums():
             fig = plt.gcf()
             self.handle_plot_result(fig)
@@ -259,4 +293,5 @@ if __name__ == "__main__":
     root.geometry(f"{window_width}x{window_height}+{x}+{y}")
 
     app = LogAnalyzerGUI(root)
+    threading.Thread(target=_warm_up_heavy_imports, daemon=True).start()
     root.mainloop()
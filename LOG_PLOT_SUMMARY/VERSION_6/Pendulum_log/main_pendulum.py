@@ -5,6 +5,8 @@ import pandas as pd
 
 from data_frame import build_df_events, build_df_resume, export_excel, write_summary
 from CONST_n_PLOT import plot_resume, plot_motor_vs_no_action, save_plot
+# log_seek.py: dossier parent (VERSION_6), résolu par le loader du GUI (generic_log_analysis)
+from log_seek import open_log_from, file_overlaps
 
 # Split log line format: "YYYY-MM-DD HH:MM:SS - message"
 # We avoid regex + pd.to_datetime per line for performance.
@@ -21,7 +23,7 @@ def _iter_split_files(split_path):
     """
     split_path peut être:
       - str / Path vers un dossier
-      - str / Path vers un fichier .txt
+      - str / Path vers un fichier .txt (ou .txt.gz)
       - list[str|Path] : plusieurs dossiers/fichiers
     """
     if isinstance(split_path, (list, tuple, set)):
@@ -33,7 +35,9 @@ def _iter_split_files(split_path):
     for item in items:
         p = Path(item)
         if p.is_dir():
-            files.extend(sorted(p.glob("*.txt")))
+            # .txt.gz = segment archivé (ignoré si la version .txt est encore là)
+            archived = [q for q in p.glob("*.txt.gz") if not q.with_suffix("").exists()]
+            files.extend(sorted(list(p.glob("*.txt")) + archived))
         elif p.is_file():
             files.append(p)
         else:
@@ -52,19 +56,23 @@ def _iter_split_files(split_path):
 
 def _parse_file_date_range(filename: str):
     """
-    Parse 'log_YYYY-MM-DD_to_YYYY-MM-DD.txt' -> (date_start, date_end) as datetime.date
+    Parse 'log_YYYY-MM-DD[(n)]_to_YYYY-MM-DD.txt[.gz]' -> (date_start, date_end) as datetime.date
+    Segment ouvert 'log_YYYY-MM-DD[(n)].txt' -> (date_start, None) (seule la borne basse est connue).
     Retourne (None, None) si format inattendu.
     """
     name = os.path.basename(filename)
-    if not (name.startswith("log_") and "_to_" in name):
+    if not name.startswith("log_"):
         return None, None
     try:
+        if name.lower().endswith(".gz"):
+            name = name[:-3]
         core = name[:-4] if name.lower().endswith(".txt") else name
         # core: log_2025-09-07_to_2025-09-30
         a = core.split("log_", 1)[1]
-        start_s, end_s = a.split("_to_", 1)
+        start_s, _, end_s = a.partition("_to_")
+        start_s = start_s.split("(", 1)[0]  # index de rotation: log_YYYY-MM-DD(2)...
         d1 = datetime.strptime(start_s, "%Y-%m-%d").date()
-        d2 = datetime.strptime(end_s, "%Y-%m-%d").date()
+        d2 = datetime.strptime(end_s, "%Y-%m-%d").date() if end_s else None
         return d1, d2
     except Exception:
         return None, None
@@ -77,6 +85,8 @@ def analyze_pendulum(split_path, start_dt, end_dt, mode="save", output_path=""):
       - parse datetime via datetime.strptime(line[:19]) (beaucoup plus rapide que pd.to_datetime)
       - break dès qu'on dépasse end_dt (sur fichiers chronologiques)
       - pas de readlines() (streaming)
+      - index sidecar par heure (log_seek): skip fichier + seek direct sur start_dt
+      - segments archivés .txt.gz lus en streaming (décompression à la volée)
     """
     # Normalize to python datetime
     start_dt = pd.to_datetime(start_dt).to_pydatetime()
@@ -91,11 +101,16 @@ def analyze_pendulum(split_path, start_dt, end_dt, mode="save", output_path=""):
     for fpath in split_files:
         # Skip file if filename date range doesn't overlap
         f_start, f_end = _parse_file_date_range(str(fpath))
-        if f_start and f_end:
-            if f_end < start_dt.date() or f_start > end_dt.date():
-                continue
-
-        with open(fpath, "r", encoding="utf-8", errors="ignore") as f:
+        if f_start and f_start > end_dt.date():
+            continue
+        if f_end and f_end < start_dt.date():
+            continue
+        # Skip file if its sidecar index (min/max timestamps) doesn't overlap
+        if not file_overlaps(fpath, start_dt, end_dt):
+            continue
+
+        # Seek direct sur start_dt (dichotomie, fallback linéaire si non chronologique)
+        with open_log_from(fpath, start_dt, errors="ignore") as f:
             for line in f:
                 if not line:
                     continue
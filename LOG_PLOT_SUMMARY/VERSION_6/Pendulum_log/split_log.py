@@ -1,14 +1,30 @@
+import gzip
+import json
 import os
 import re
-from datetime import datetime, timedelta
+import zlib
+from datetime import date, datetime, timedelta
+from itertools import chain
 import pandas as pd
 
 PAT_INIT = re.compile(r"(\d+)\s*ms\s*;\s*Init", re.IGNORECASE)
 PAT_TS   = re.compile(r"(\d+)")
+_MS_UNITS = frozenset(("ms", "MS", "Ms", "mS"))
 
 DELTA_TIME_MS = 5 * 3600 * 1000
 DAY_START_HOUR = 9
 DAY_MS = 24 * 3600 * 1000  # 24h en ms
+WRITE_CHUNK_LINES = 8192    # lignes accumulées par mois avant un write()
+READ_CHUNK_BYTES = 1024 * 1024
+GZIP_SUFFIX = ".gz"  # LOG.TXT ou LOG.TXT.gz (segments archivés par DateBasedFileHandler)
+
+# Reprise incrémentale: état de reconstruction + offset dans LOG.TXT, dans le dossier de sortie
+SPLIT_STATE_FILE = ".split_state.json"
+SPLIT_STATE_VERSION = 1
+FINGERPRINT_BYTES = 4096    # octets avant l'offset comparés (crc32): même LOG.TXT, qui a grandi
+CLOCK_STATE_KEYS = ("day_index", "prev_init_ref", "prev_raw_time", "consecutive_init",
+                    "anchor_dt_ms", "anchor_ms", "last_line_ms", "last_ts_seen")
+CHECKPOINT = ""             # produit par iter_raw_lines (jamais une vraie ligne)
 
 
 def month_start(d: datetime) -> datetime:
@@ -41,13 +57,37 @@ def iterate_month_ranges(start_dt: datetime, end_dt: datetime):
             cur = cur.replace(month=cur.month + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
 
 
+def clean_message(text: str) -> str:
+    msg = text.strip().replace("\r", "").replace("\n", "").strip()
+    return msg.lower()
+
+
 def extract_message(line: str) -> str:
     if ";" in line:
-        msg = line.split(";", 1)[1].strip()
-    else:
-        msg = line.strip()
-    msg = msg.replace("\r", "").replace("\n", "").strip()
-    return msg.lower()
+        return clean_message(line.split(";", 1)[1])
+    return clean_message(line)
+
+
+def parse_raw_line(line: str):
+    """
+    Ligne brute Arduino "<ms> ms ; <message>" -> (raw_time, is_init, texte du message), None sans timestamp.
+    Format attendu (chiffres / "ms" / "Init" ASCII, un seul ';'): découpage sans regex.
+    Sinon PAT_TS / PAT_INIT: mêmes résultats que PAT_TS.search + PAT_INIT.search + extract_message.
+    """
+    head, sep, rest = line.partition(";")
+    if sep and ";" not in rest:
+        num = head.strip()
+        if num[-2:] in _MS_UNITS:
+            num = num[:-2].rstrip()
+            if num.isascii() and num.isdigit():
+                word = rest.lstrip()[:4]
+                if word.isascii():
+                    return int(num), word.lower() == "init", rest
+
+    m = PAT_TS.search(line)
+    if not m:
+        return None
+    return int(m.group(1)), PAT_INIT.search(line) is not None, rest if sep else line
 
 
 def day_base_datetime(start_dt: datetime, day_index: int) -> datetime:
@@ -55,7 +95,154 @@ def day_base_datetime(start_dt: datetime, day_index: int) -> datetime:
     return datetime(base_date.year, base_date.month, base_date.day, DAY_START_HOUR, 0, 0)
 
 
-def split_log_by_month_with_datetime(file_path: str, start_dt, end_dt, output_dir: str | None = None):
+def datetime_to_ms(d: datetime) -> int:
+    """ms entières depuis le jour ordinal 0 (date.fromordinal): instants du splitter sans objets datetime."""
+    return ((d.toordinal() * 86400 + d.hour * 3600 + d.minute * 60 + d.second) * 1000
+            + d.microsecond // 1000)
+
+
+def day_base_ms(start_dt: datetime, day_index: int) -> int:
+    return datetime_to_ms(day_base_datetime(start_dt, day_index))
+
+
+class TimestampFormatter:
+    """
+    ms (datetime_to_ms) -> 'YYYY-MM-DD HH:MM:SS', comme strftime du datetime correspondant.
+    Date rendue une fois par jour, texte complet une fois par seconde (lignes consécutives).
+    """
+
+    def __init__(self):
+        self._day = None
+        self._date_prefix = ""
+        self._second = None
+        self._text = ""
+
+    def format(self, line_ms: int) -> str:
+        second = line_ms // 1000
+        if second != self._second:
+            self._second = second
+            day, sec_of_day = divmod(second, 86400)
+            if day != self._day:
+                self._day = day
+                self._date_prefix = date.fromordinal(day).strftime("%Y-%m-%d ")
+            hours, rem = divmod(sec_of_day, 3600)
+            minutes, seconds = divmod(rem, 60)
+            self._text = f"{self._date_prefix}{hours:02d}:{minutes:02d}:{seconds:02d}"
+        return self._text
+
+
+def month_output_name(r_start: datetime, r_end: datetime) -> str:
+    return f"log_{r_start.strftime('%Y-%m-%d')}_to_{r_end.strftime('%Y-%m-%d')}.txt"
+
+
+def open_raw_log(file_path: str):
+    """LOG.TXT en binaire (un .gz est décompressé en streaming): offsets en octets pour la reprise."""
+    if str(file_path).lower().endswith(GZIP_SUFFIX):
+        return gzip.open(file_path, "rb")
+    return open(file_path, "rb")
+
+
+def iter_raw_lines(fb, checkpoint: dict):
+    """
+    Lignes de fb (positionné à checkpoint["offset"]) décodées en utf-8 (errors="ignore") et découpées
+    comme en mode texte (\n, \r\n, \r). Une fois toutes les lignes terminées lues, produit CHECKPOINT
+    avec checkpoint["offset"] / checkpoint["tail"] (derniers octets lus) à jour. Une dernière ligne
+    incomplète (dump pris pendant une écriture) vient après: elle sera relue à la reprise.
+    """
+    offset = checkpoint["offset"]
+    tail = checkpoint["tail"]
+    carry = b""
+    while True:
+        chunk = fb.read(READ_CHUNK_BYTES)
+        if not chunk:
+            break
+        data = carry + chunk
+        raw_lines = data.splitlines(True)
+        carry = b"" if data.endswith(b"\n") else raw_lines.pop()
+        consumed = len(data) - len(carry)
+        tail = (tail + data[:consumed])[-FINGERPRINT_BYTES:]
+        offset += consumed
+        for raw in raw_lines:
+            yield raw.decode("utf-8", "ignore")
+
+    checkpoint["offset"] = offset
+    checkpoint["tail"] = tail
+    yield CHECKPOINT
+    line = carry.decode("utf-8", "ignore")
+    if line:
+        yield line
+
+
+def read_split_state(state_path: str):
+    """Contenu de SPLIT_STATE_FILE, None s'il est absent / illisible / d'une autre version."""
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or state.get("version") != SPLIT_STATE_VERSION:
+        return None
+    return state
+
+
+def check_split_state(state: dict, fb, start_dt: datetime, end_dt: datetime, output_dir: str):
+    """
+    Octets avant l'offset si state permet de reprendre, sinon None (split complet):
+    même start_dt, end_dt identique ou prolongé (aucune ligne déjà écartée après l'ancien end_dt),
+    même LOG.TXT (crc32 des octets avant l'offset) et sorties mensuelles au moins aussi longues.
+    fb est alors laissé à l'offset de reprise.
+    """
+    try:
+        if state["start_dt"] != start_dt.isoformat():
+            return None
+        old_end = datetime.fromisoformat(state["end_dt"])
+        if end_dt < old_end:
+            return None
+        if end_dt != old_end and (start_dt + timedelta(days=state["day_index"])).date() > old_end.date():
+            return None
+
+        offset = state["offset"]
+        start = max(0, offset - FINGERPRINT_BYTES)
+        fb.seek(start)
+        tail = fb.read(offset - start)
+        if len(tail) != offset - start or zlib.crc32(tail) != state["fingerprint"]:
+            return None
+
+        for _, _, name, size in state["outputs"]:
+            if os.path.getsize(os.path.join(output_dir, name)) < size:
+                return None
+    except (OSError, ValueError, KeyError, TypeError, EOFError):
+        return None
+    return tail
+
+
+def save_split_state(state_path: str, checkpoint: dict, start_dt: datetime, end_dt: datetime,
+                     month_files: dict, clock: dict):
+    """Vide les sorties sur disque puis écrit l'état (fichier temporaire + os.replace)."""
+    outputs = []
+    for (year, month), (fh, pending) in month_files.items():
+        fh.write("".join(pending))
+        pending.clear()
+        fh.flush()
+        outputs.append([year, month, os.path.basename(fh.name), os.fstat(fh.fileno()).st_size])
+
+    state = {
+        "version": SPLIT_STATE_VERSION,
+        "start_dt": start_dt.isoformat(),
+        "end_dt": end_dt.isoformat(),
+        "offset": checkpoint["offset"],
+        "fingerprint": zlib.crc32(checkpoint["tail"]),
+        "outputs": outputs,
+    }
+    state.update(clock)
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+
+def split_log_by_month_with_datetime(file_path: str, start_dt, end_dt, output_dir: str | None = None,
+                                     resume: bool = True):
     start_dt = pd.to_datetime(start_dt).to_pydatetime()
     end_dt   = pd.to_datetime(end_dt).to_pydatetime()
 
@@ -63,28 +250,69 @@ def split_log_by_month_with_datetime(file_path: str, start_dt, end_dt, output_di
         output_dir = os.path.dirname(file_path) or "."
     os.makedirs(output_dir, exist_ok=True)
 
-    # Trouver le premier Init
-    first_init_idx = None
-    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-        for idx, line in enumerate(f):
+    # Reprise: état du run précédent (resume=False ou état invalide -> split complet)
+    state_path = os.path.join(output_dir, SPLIT_STATE_FILE)
+    fb = open_raw_log(file_path)
+    previous = read_split_state(state_path)
+    tail = None
+    if resume and previous is not None:
+        tail = check_split_state(previous, fb, start_dt, end_dt, output_dir)
+    state = previous if tail is not None else None
+    if state is None:
+        fb.seek(0)
+        checkpoint = {"offset": 0, "tail": b""}
+        if previous is not None:
+            os.remove(state_path)
+    else:
+        checkpoint = {"offset": state["offset"], "tail": tail}
+        print(f"↪ Reprise à l'octet {state['offset']:,} de {file_path}")
+    lines = iter_raw_lines(fb, checkpoint)
+
+    head = []
+    if state is None:
+        # Une seule lecture: lignes gardées en mémoire jusqu'au premier Init, puis streaming
+        for line in lines:
+            head.append(line)
             if PAT_INIT.search(line):
-                first_init_idx = idx
                 break
-    if first_init_idx is None:
-        raise ValueError("Aucun 'Init' trouvé dans le fichier.")
+        else:
+            fb.close()
+            raise ValueError("Aucun 'Init' trouvé dans le fichier.")
+        first_init_idx = len(head) - 1
+    else:
+        first_init_idx = -1  # premier Init traité avant le checkpoint
 
-    # Ouvrir fichiers mensuels
+    # Ouvrir fichiers mensuels: (année, mois) -> (fichier, lignes en attente)
+    # Reprise: sorties existantes tronquées à leur taille au checkpoint puis complétées
+    resumed = {} if state is None else {(y, m): (name, size) for y, m, name, size in state["outputs"]}
     month_files = {}
     for r_start, r_end in iterate_month_ranges(start_dt, end_dt):
-        name = f"log_{r_start.strftime('%Y-%m-%d')}_to_{r_end.strftime('%Y-%m-%d')}.txt"
-        out_path = os.path.join(output_dir, name)
-        month_files[(r_start.date(), r_end.date())] = open(out_path, "w", encoding="utf-8")
+        key = (r_start.year, r_start.month)
+        out_path = os.path.join(output_dir, month_output_name(r_start, r_end))
+        if key in resumed:
+            old_name, size = resumed[key]
+            if old_name != os.path.basename(out_path):
+                os.replace(os.path.join(output_dir, old_name), out_path)  # end_dt prolongé
+            with open(out_path, "r+b") as fo:
+                fo.truncate(size)
+            month_files[key] = (open(out_path, "a", encoding="utf-8"), [])
+        else:
+            month_files[key] = (open(out_path, "w", encoding="utf-8"), [])
+
+    # Split complet: sorties du run précédent qui ne sont plus produites (autre end_dt) -> supprimées,
+    # sinon leurs lignes seraient comptées deux fois par l'analyse (log_*.txt du dossier)
+    if state is None and previous is not None:
+        produced = {os.path.basename(fh.name) for fh, _ in month_files.values()}
+        for output in previous.get("outputs", []):
+            name = os.path.basename(str(output[2]))
+            if name not in produced:
+                try:
+                    os.remove(os.path.join(output_dir, name))
+                except OSError:
+                    pass
 
     def get_month_writer(d: datetime):
-        for (a, b), fh in month_files.items():
-            if a <= d.date() <= b:
-                return fh
-        return None
+        return month_files.get((d.year, d.month))
 
     # ====== Etat journée (day_index) ======
     day_index = 0
@@ -92,19 +320,36 @@ def split_log_by_month_with_datetime(file_path: str, start_dt, end_dt, output_di
     prev_raw_time = None
     consecutive_init = False
 
-    # ====== Ancre temps ======
-    anchor_dt = day_base_datetime(start_dt, day_index)  # 09:00 du jour courant
+    # ====== Ancre temps (instants en ms entières, cf. datetime_to_ms) ======
+    anchor_dt_ms = day_base_ms(start_dt, day_index)  # 09:00 du jour courant
     anchor_ms = None
-    last_dt_line = None
+    last_line_ms = None
     last_ts_seen = None
+    format_ts = TimestampFormatter().format
+
+    if state is not None:
+        (day_index, prev_init_ref, prev_raw_time, consecutive_init,
+         anchor_dt_ms, anchor_ms, last_line_ms, last_ts_seen) = (state[k] for k in CLOCK_STATE_KEYS)
+
+    # Mois de sortie recalculé seulement quand day_index change
+    writer_day_index = None
+    writer = None
+
+    with fb:
+        for idx, line in enumerate(chain(head, lines)):
+            if not line:  # CHECKPOINT
+                # toutes les lignes complètes sont traitées (sans Init encore: pas de reprise possible)
+                if idx > first_init_idx:
+                    save_split_state(state_path, checkpoint, start_dt, end_dt, month_files, dict(zip(
+                        CLOCK_STATE_KEYS,
+                        (day_index, prev_init_ref, prev_raw_time, consecutive_init,
+                         anchor_dt_ms, anchor_ms, last_line_ms, last_ts_seen))))
+                continue
 
-    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-        for idx, line in enumerate(f):
-            m = PAT_TS.search(line)
-            if not m:
+            parsed = parse_raw_line(line)
+            if parsed is None:
                 continue
-            raw_time = int(m.group(1))
-            is_init = PAT_INIT.search(line) is not None
+            raw_time, is_init, message = parsed
 
             if anchor_ms is None:
                 anchor_ms = raw_time
@@ -112,11 +357,11 @@ def split_log_by_month_with_datetime(file_path: str, start_dt, end_dt, output_di
             # reboot (timestamp repart en arrière)
             if last_ts_seen is not None and raw_time < last_ts_seen:
                 # on CONTINUE depuis le dernier dt calculé, pas retour à 09:00
-                if last_dt_line is not None:
-                    anchor_dt = last_dt_line
+                if last_line_ms is not None:
+                    anchor_dt_ms = last_line_ms
                     anchor_ms = raw_time
                 else:
-                    anchor_dt = day_base_datetime(start_dt, day_index)
+                    anchor_dt_ms = day_base_ms(start_dt, day_index)
                     anchor_ms = raw_time
             last_ts_seen = raw_time
 
@@ -128,7 +373,7 @@ def split_log_by_month_with_datetime(file_path: str, start_dt, end_dt, output_di
 
                     # premier init => 09:00 jour 0 exactement ici
                     if idx == first_init_idx:
-                        anchor_dt = day_base_datetime(start_dt, day_index)
+                        anchor_dt_ms = day_base_ms(start_dt, day_index)
                         anchor_ms = raw_time
                 else:
                     if prev_raw_time is None:
@@ -137,7 +382,7 @@ def split_log_by_month_with_datetime(file_path: str, start_dt, end_dt, output_di
 
                     if delta > DELTA_TIME_MS:
                         day_index += 1
-                        anchor_dt = day_base_datetime(start_dt, day_index)  # 09:00 nouvelle journée
+                        anchor_dt_ms = day_base_ms(start_dt, day_index)  # 09:00 nouvelle journée
                         anchor_ms = raw_time
 
                     prev_init_ref = raw_time
@@ -152,26 +397,35 @@ def split_log_by_month_with_datetime(file_path: str, start_dt, end_dt, output_di
             if elapsed_ms >= DAY_MS:
                 extra_days = elapsed_ms // DAY_MS
                 day_index += extra_days
-                anchor_dt = day_base_datetime(start_dt, day_index)  # 09:00 du nouveau jour
+                anchor_dt_ms = day_base_ms(start_dt, day_index)  # 09:00 du nouveau jour
                 anchor_ms = anchor_ms + extra_days * DAY_MS
                 elapsed_ms = raw_time - anchor_ms  # recalc après shift
 
             if elapsed_ms < 0:
                 elapsed_ms = 0
 
-            dt_line = anchor_dt + timedelta(milliseconds=elapsed_ms)
-            last_dt_line = dt_line
+            line_ms = anchor_dt_ms + elapsed_ms
+            last_line_ms = line_ms
 
-            logical_date = start_dt + timedelta(days=day_index)
-            if logical_date.date() < start_dt.date() or logical_date.date() > end_dt.date():
+            if day_index != writer_day_index:
+                writer_day_index = day_index
+                logical_date = start_dt + timedelta(days=day_index)
+                if logical_date.date() < start_dt.date() or logical_date.date() > end_dt.date():
+                    writer = None
+                else:
+                    writer = get_month_writer(logical_date)
+            if writer is None:
                 continue
 
-            fh = get_month_writer(logical_date)
-            if fh is not None:
-                msg = extract_message(line)
-                fh.write(f"{dt_line.strftime('%Y-%m-%d %H:%M:%S')} - {msg}\n")
+            fh, pending = writer
+            msg = clean_message(message)
+            pending.append(f"{format_ts(line_ms)} - {msg}\n")
+            if len(pending) >= WRITE_CHUNK_LINES:
+                fh.write("".join(pending))
+                pending.clear()
 
-    for fh in month_files.values():
+    for fh, pending in month_files.values():
+        fh.write("".join(pending))
         fh.close()
 
     print("✅ Terminé : plus de date qui recule, 09:00 seulement vraie nouvelle journée.")
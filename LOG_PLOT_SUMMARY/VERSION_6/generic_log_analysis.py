@@ -1,16 +1,25 @@
+import calendar
+import copy
+import hashlib
+import io
+import json
 import os
 import re
 import shutil
 import sys
+import time
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
 import sys
-import numpy as np
-import matplotlib.pyplot as plt
+# numpy / matplotlib: importés à la demande (démarrage rapide du GUI)
 from collections import defaultdict
-from datetime import datetime
+from itertools import repeat
+from datetime import datetime, timedelta
+
+from log_seek import (file_date_range, file_overlaps, find_log_offset, is_gzip_log, load_index,
+                      name_overlaps, open_log)
 
 
 
@@ -76,6 +85,7 @@ def _no_matplotlib_show():
     """
     Empêche plt.show() d'ouvrir une fenêtre ou de bloquer (utile dans le GUI).
     """
+    import matplotlib.pyplot as plt
     _orig_show = plt.show
     try:
         plt.show = lambda *a, **k: None
@@ -83,29 +93,6 @@ def _no_matplotlib_show():
     finally:
         plt.show = _orig_show
 
-def _concat_log_files(files):
-    """
-    Concatène plusieurs logs en un seul fichier temporaire (garde l'ordre).
-    Retourne (path_to_use, temp_to_cleanup_or_None).
-    """
-    if not files:
-        raise ValueError("files is empty")
-
-    if len(files) == 1:
-        return files[0], None
-
-    tmp_fd, tmp_path = tempfile.mkstemp(prefix="concat_log_", suffix=".txt")
-    os.close(tmp_fd)
-
-    with open(tmp_path, "w", encoding="utf-8", errors="ignore") as out:
-        for fp in files:
-            with open(fp, "r", encoding="utf-8", errors="ignore") as f:
-                out.write(f.read())
-            out.write("\n")
-
-    return tmp_path, tmp_path
-
-
 
 def analyze_pendulum_adapter(files, start_dt, end_dt, mode="run", output_dir=None, gui_dir=None):
     """
@@ -140,6 +127,7 @@ def analyze_pendulum_adapter(files, start_dt, end_dt, mode="run", output_dir=Non
             output_path=output_dir or ""
         )
 
+    import matplotlib.pyplot as plt
     fig = plt.gcf() if plt.get_fignums() else None
     return {"project_name": "Pendulum", "special": True}, fig
 
@@ -199,15 +187,19 @@ def analyze_chliran_adapter(files, start_dt, end_dt, mode="run", output_dir=None
             project_name="Chliran"
         )
 
+    import matplotlib.pyplot as plt
     fig = plt.gcf() if plt.get_fignums() else None
     return {"project_name": "Chliran", "special": True}, fig
 
-def run_analysis_dispatch(files, start_dt, end_dt, interval, event_config, project_name):
+def run_analysis_dispatch(files, start_dt, end_dt, interval, event_config, project_name, workers=None,
+                          cache_dir=None):
     """
     Point d'entrée unique pour le GUI.
     Retourne (result_dict, fig)
     - Pour projects "classiques" => result_dict = output analyze_logs, fig = plot_counts(...)
     - Pour Pendulum/Chliran => result_dict = {"special":True,...}, fig = figure matplotlib créée par leur code
+    - workers > 1 => analyse des fichiers en parallèle (process pool), même résultat
+    - cache_dir (ex: ANALYSIS_CACHE_DIR) => partials par fichier réutilisés d'un run à l'autre
     """
     proj = str(project_name).strip()
     if proj.lower() == "pendulum":
@@ -221,7 +213,9 @@ def run_analysis_dispatch(files, start_dt, end_dt, interval, event_config, proje
         end_dt=end_dt,
         interval=interval,
         event_config=event_config,
-        project_name=proj
+        project_name=proj,
+        cache_dir=cache_dir,
+        workers=workers
     )
     if not result:
         return None, None
@@ -247,15 +241,25 @@ def _find_project_file(gui_dir, project_folder, filename):
 
 
 
-def _load_module_from_file_compat(module_name, file_path):
+# Cache des modules projets (Pendulum / Chliran / split_log):
+#   (module_name, chemin) -> (signature des .py du dossier, module)
+#   chemin -> (mtime_ns, size, code compilé)
+_PROJECT_MODULE_CACHE = {}
+_COMPILED_CODE_CACHE = {}
+# Modules partagés par les projets (log_seek.py): ce dossier (VERSION_6)
+SHARED_MODULES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _compile_compat(file_path):
     """
-    Charge un .py via chemin (sans package).
+    Compile un .py (avec cache tant que le fichier ne change pas).
     Compat Python 3.9: remplace les annotations 'X | None' par Optional[X].
-    IMPORTANT:
-      - ajoute temporairement le dossier du fichier à sys.path (imports locaux)
-      - isole les imports en nettoyant temporairement sys.modules des modules locaux
-        (évite conflit data_frame.py entre Chliran et Pendulum quand on lance l'un après l'autre)
     """
+    st = os.stat(file_path)
+    cached = _COMPILED_CODE_CACHE.get(file_path)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+
     with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
         src = f.read()
 
@@ -266,21 +270,49 @@ def _load_module_from_file_compat(module_name, file_path):
         src = re.sub(r"(\b[a-zA-Z_][a-zA-Z0-9_]*\b)\s*\|\s*None", r"Optional[\1]", src)
         src = re.sub(r"None\s*\|\s*(\b[a-zA-Z_][a-zA-Z0-9_]*\b)", r"Optional[\1]", src)
 
-    spec = importlib.util.spec_from_loader(module_name, loader=None)
-    mod = importlib.util.module_from_spec(spec)
-    mod.__file__ = file_path
+    code = compile(src, file_path, "exec")
+    _COMPILED_CODE_CACHE[file_path] = (st.st_mtime_ns, st.st_size, code)
+    return code
 
+
+def _load_module_from_file_compat(module_name, file_path):
+    """
+    Charge un .py via chemin (sans package).
+    Compat Python 3.9: remplace les annotations 'X | None' par Optional[X].
+    IMPORTANT:
+      - ajoute temporairement le dossier du fichier à sys.path (imports locaux), ainsi que
+        SHARED_MODULES_DIR (log_seek.py...): seul endroit où les projets trouvent les modules partagés
+      - isole les imports en nettoyant temporairement sys.modules des modules locaux
+        (évite conflit data_frame.py entre Chliran et Pendulum quand on lance l'un après l'autre)
+      - le module est gardé en cache et réutilisé tant qu'aucun .py du dossier n'a changé
+        (mtime/taille): pas de ré-exécution ni de ré-import pandas à chaque clic du GUI
+    """
     module_dir = os.path.dirname(os.path.abspath(file_path))
-    added_path = False
+    added_paths = []
 
     # Collect local module names in this folder (e.g., data_frame, CONST_n_PLOT, etc.)
     local_names = []
+    signature = []
     try:
-        for fn in os.listdir(module_dir):
+        for fn in sorted(os.listdir(module_dir)):
             if fn.endswith(".py") and fn != "__init__.py":
                 local_names.append(os.path.splitext(fn)[0])
+                st = os.stat(os.path.join(module_dir, fn))
+                signature.append((fn, st.st_mtime_ns, st.st_size))
     except Exception:
         local_names = []
+        signature = None
+
+    cache_key = (module_name, os.path.abspath(file_path))
+    cached = _PROJECT_MODULE_CACHE.get(cache_key)
+    if cached is not None and signature is not None and cached[0] == tuple(signature):
+        return cached[1]
+
+    code = _compile_compat(os.path.abspath(file_path))
+
+    spec = importlib.util.spec_from_loader(module_name, loader=None)
+    mod = importlib.util.module_from_spec(spec)
+    mod.__file__ = file_path
 
     # Temporarily remove those names from sys.modules to avoid cross-project caching
     saved_modules = {}
@@ -292,17 +324,18 @@ def _load_module_from_file_compat(module_name, file_path):
     # Also remove common matplotlib caches that can keep old figures (safe)
     # (not strictly required; leave as-is)
 
-    if module_dir and module_dir not in sys.path:
-        sys.path.insert(0, module_dir)
-        added_path = True
+    for path in (SHARED_MODULES_DIR, module_dir):
+        if path and path not in sys.path:
+            sys.path.insert(0, path)
+            added_paths.append(path)
 
     try:
-        exec(compile(src, file_path, "exec"), mod.__dict__)
+        exec(code, mod.__dict__)
     finally:
         # restore sys.path
-        if added_path:
+        for path in added_paths:
             try:
-                sys.path.remove(module_dir)
+                sys.path.remove(path)
             except ValueError:
                 pass
 
@@ -313,6 +346,8 @@ def _load_module_from_file_compat(module_name, file_path):
         for name, module_obj in saved_modules.items():
             sys.modules[name] = module_obj
 
+    if signature is not None:
+        _PROJECT_MODULE_CACHE[cache_key] = (tuple(signature), mod)
     return mod
 
 def _split_raw_logs(project_folder, raw_files, start_dt, end_dt, out_dir, gui_dir):
@@ -491,6 +526,56 @@ HOUR_END_DAY = 18
 def get_time_key(timestamp, interval):
     return timestamp.strftime("%Y-%m-%d %H:00") if interval == "hour" else timestamp.strftime("%Y-%m-%d")
 
+
+# Préfixe standard d'une ligne: "YYYY-MM-DD HH:MM:SS - " (largeur fixe)
+PAT_TS_PREFIX = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} - ", re.ASCII)
+
+
+def _make_timestamp_decoder(interval):
+    """
+    Retourne decode(line) -> (datetime, time_key).
+      - préfixe standard: champs entiers lus par slicing (pas de strptime)
+      - mémorise la dernière seconde vue et la dernière clé de bucket (rafales de lignes)
+      - ligne non standard: même chemin qu'avant (split + strptime), ValueError si invalide
+    """
+    last_prefix = None
+    last_pair = None
+    last_bucket_prefix = None
+    last_key = None
+    bucket_len = 13 if interval == "hour" else 10  # "YYYY-MM-DD HH" / "YYYY-MM-DD"
+
+    def decode(line):
+        nonlocal last_prefix, last_pair, last_bucket_prefix, last_key
+
+        if not PAT_TS_PREFIX.match(line):
+            timestamp = datetime.strptime(line.split(" - ")[0], "%Y-%m-%d %H:%M:%S")
+            return timestamp, get_time_key(timestamp, interval)
+
+        prefix = line[:19]
+        if prefix == last_prefix:
+            return last_pair
+
+        try:
+            timestamp = datetime(
+                int(prefix[0:4]), int(prefix[5:7]), int(prefix[8:10]),
+                int(prefix[11:13]), int(prefix[14:16]), int(prefix[17:19])
+            )
+        except ValueError:
+            # ex: 2025-02-30 -> même erreur que strptime
+            timestamp = datetime.strptime(prefix, "%Y-%m-%d %H:%M:%S")
+
+        bucket_prefix = prefix[:bucket_len]
+        if bucket_prefix != last_bucket_prefix:
+            last_bucket_prefix = bucket_prefix
+            last_key = get_time_key(timestamp, interval)
+
+        last_prefix = prefix
+        last_pair = (timestamp, last_key)
+        return last_pair
+
+    return decode
+
+
 def detect_project_name(file_path):
     patterns = {
         "Rocket Hydrogen": "The rocket has ignited",
@@ -500,7 +585,7 @@ def detect_project_name(file_path):
         "Light a Fire": "Peak temperature reached:"
     }
     try:
-        with open(file_path, encoding="utf-8") as f:
+        with open_log(file_path) as f:
             lines = f.read()
             for name, keyword in patterns.items():
                 if keyword.lower() in lines.lower():
@@ -520,100 +605,671 @@ def label_title_summary(project):
     }.get(project, project.lower())
 
 
-def analyze_logs(files, start_dt, end_dt, interval, event_config, project_name):
-    counters = {label: defaultdict(int) for label in event_config}
-    language_eng_counter = defaultdict(int)
-    language_heb_counter = defaultdict(int)
-    language_arb_counter = defaultdict(int)
+# Mots-clés "built-in" comptés pour tous les projets classiques
+LANGUAGE_KEYWORDS = {
+    "Language: English": "your language is: english",
+    "Language: Hebrew": "your language is: hebrew",
+    "Language: Arabic": "your language is: arabic",
+}
+ERROR_PARSING_KEYWORD = "Error parsing data:"
+UI_RESTART_KEYWORDS = [
+    "Starting Hydrogen Rocket UI",
+    "Starting Horse Power UI",
+    "Starting Air Pressure UI",
+    "Starting Jumping Ring UI",
+    "Starting Light a Fire UI"
+]
+#ARDUINO_DISCONNECT_KEYWORD = "Error reading from serial, Arduino probably disconnected"
+ARDUINO_DISCONNECT_KEYWORD = "Arduino disconnected. Trying to reconnect to Arduino..."
+
+
+def _build_keyword_matcher(event_config):
+    """
+    Compile UNE seule regex avec tous les mots-clés (event_config + built-ins).
+    Retourne match(line_lower) -> set des cibles touchées par la ligne, en un seul passage:
+      ("event", label), ("lang", label), ("parse_error", None),
+      ("ui_restart", None), ("arduino_disconnect", None)
+    """
+    targets_by_kw = defaultdict(set)
+    for label, keyword in event_config.items():
+        targets_by_kw[keyword.lower()].add(("event", label))
+    for label, keyword in LANGUAGE_KEYWORDS.items():
+        targets_by_kw[keyword.lower()].add(("lang", label))
+    targets_by_kw[ERROR_PARSING_KEYWORD.lower()].add(("parse_error", None))
+    for keyword in UI_RESTART_KEYWORDS:
+        targets_by_kw[keyword.lower()].add(("ui_restart", None))
+    targets_by_kw[ARDUINO_DISCONNECT_KEYWORD.lower()].add(("arduino_disconnect", None))
+
+    # "" est contenu dans toutes les lignes (comme avec `in`)
+    always = frozenset(targets_by_kw.pop("", ()))
+
+    # Le plus long d'abord: à une position donnée la regex prend le mot-clé le plus long,
+    # et un match implique tous les mots-clés qu'il contient.
+    keywords = sorted(targets_by_kw, key=len, reverse=True)
+    implied = {
+        kw: frozenset().union(*(targets_by_kw[k] for k in keywords if k in kw))
+        for kw in keywords
+    }
+    if not keywords:
+        return lambda line_lower: set(always)
+
+    search = re.compile("|".join(re.escape(k) for k in keywords)).search
+
+    def match(line_lower):
+        hits = set(always)
+        m = search(line_lower)
+        while m is not None:
+            hits |= implied[m.group()]
+            # repartir juste après le début du match: garde les mots-clés qui se chevauchent
+            m = search(line_lower, m.start() + 1)
+        return hits
+
+    return match
+
+
+# Cache d'agrégation par fichier (reprise sur les logs qui grandissent), opt-in:
+# analyze_logs(..., cache_dir=ANALYSIS_CACHE_DIR). Une entrée par (fichier, interval, config).
+# Le GUI l'active dans le dossier de cache de l'utilisateur (%LOCALAPPDATA% / $XDG_CACHE_HOME / ~/.cache).
+if os.name == "nt":
+    _USER_CACHE_DIR = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+else:
+    _USER_CACHE_DIR = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+ANALYSIS_CACHE_DIR = os.path.join(_USER_CACHE_DIR, "log_analysis")
+ANALYSIS_CACHE_VERSION = 2
+CACHE_MAX_AGE_DAYS = 30  # entrée pas relue depuis -> supprimée (logs effacés / renommés)
+ALL_TIME = (datetime.min, datetime.max)  # fenêtre du partial mis en cache (fichier entier)
+CACHE_CHECK_BYTES = 64  # octets juste avant l'offset sauvegardé (détecte un fichier remplacé)
+
+
+def _new_partial(event_config):
+    """État de comptage d'un (morceau de) fichier, fusionnable avec _merge_partial."""
+    return {
+        "counters": {label: defaultdict(int) for label in event_config},
+        "languages": {label: defaultdict(int) for label in LANGUAGE_KEYWORDS},
+        "first": None,
+        "last": None,
+        "ui_restart": 0,
+        "arduino_disconnect": 0,
+        "parse_error": 0,
+        "any_data": False,
+    }
+
+
+def _merge_partial(total, partial):
+    """Ajoute partial dans total (ordre des clés = ordre de première apparition, comme en séquentiel)."""
+    for group in ("counters", "languages"):
+        for label, counter in partial[group].items():
+            dst = total[group][label]
+            for key, n in counter.items():
+                dst[key] += n
+    if partial["first"] is not None and (total["first"] is None or partial["first"] < total["first"]):
+        total["first"] = partial["first"]
+    if partial["last"] is not None and (total["last"] is None or partial["last"] > total["last"]):
+        total["last"] = partial["last"]
+    total["ui_restart"] += partial["ui_restart"]
+    total["arduino_disconnect"] += partial["arduino_disconnect"]
+    total["parse_error"] += partial["parse_error"]
+    total["any_data"] = total["any_data"] or partial["any_data"]
+
+
+def _scan_lines(lines, partial, start_dt, end_dt, match_keywords, decode_timestamp):
+    """Boucle de comptage (chemin chaud): met à jour partial avec les lignes dans [start_dt, end_dt]."""
+    counters = partial["counters"]
+    language_counters = partial["languages"]
+    first_dt = partial["first"]
+    last_dt = partial["last"]
+    ui_restart_counter = partial["ui_restart"]
+    arduino_disconnect_counter = partial["arduino_disconnect"]
+    arduino_error_parsing_counter = partial["parse_error"]
+    any_data_found = partial["any_data"]
+
+    for line in lines:
+        try:
+            timestamp, time_key = decode_timestamp(line)
+
+            if not (start_dt <= timestamp <= end_dt):
+                continue
+
+            if first_dt is None or timestamp < first_dt:
+                first_dt = timestamp
+            if last_dt is None or timestamp > last_dt:
+                last_dt = timestamp
+
+            hits = match_keywords(line.lower())
+            if not hits:
+                continue
+
+            in_day_hours = (timestamp.hour > HOUR_BEGIN_DAY or (
+                timestamp.hour == HOUR_BEGIN_DAY and timestamp.minute >= MINUTE_BEGIN_DAY)) and timestamp.hour < HOUR_END_DAY
+
+            for kind, label in hits:
+                if kind == "event":
+                    counters[label][time_key] += 1
+                    any_data_found = True
+                elif kind == "lang":
+                    language_counters[label][time_key] += 1
+                    any_data_found = True
+                elif kind == "parse_error":
+                    arduino_error_parsing_counter += 1
+                    any_data_found = True
+                elif in_day_hours:
+                    if kind == "ui_restart":
+                        ui_restart_counter += 1
+                    else:
+                        arduino_disconnect_counter += 1
+
+        except Exception:
+            print(f"Skipping line (parse error): {line.rstrip()}", file=sys.stderr)
+
+    partial["first"] = first_dt
+    partial["last"] = last_dt
+    partial["ui_restart"] = ui_restart_counter
+    partial["arduino_disconnect"] = arduino_disconnect_counter
+    partial["parse_error"] = arduino_error_parsing_counter
+    partial["any_data"] = any_data_found
+
+
+def _decode_log_line(raw_line):
+    """bytes -> ligne(s) texte, comme open(..., 'r', encoding='utf-8') (newlines universels)."""
+    text = raw_line.decode("utf-8")
+    if "\r" not in text:
+        return (text,)
+    if text.endswith("\r\n") and "\r" not in text[:-2]:
+        return (text[:-2] + "\n",)
+    return tuple(io.StringIO(text, newline=None))
+
+
+def _iter_complete_lines(f, cursor, end=None):
+    """
+    Lit f ('rb') depuis cursor["offset"] (jusqu'à end si donné) et yield les lignes texte
+    complètes (terminées par \\n). cursor["offset"] avance après chaque ligne; une dernière
+    ligne incomplète (en cours d'écriture) est laissée dans cursor["tail"].
+    """
+    pos = cursor["offset"]
+    f.seek(pos)
+    for raw_line in f:
+        if not raw_line.endswith(b"\n"):
+            cursor["tail"] = raw_line
+            return
+        pos += len(raw_line)
+        cursor["offset"] = pos
+        yield from _decode_log_line(raw_line)
+        if end is not None and pos >= end:
+            return
+
+
+# Mode parallèle sur UN gros fichier: plages d'octets alignées sur les lignes
+CHUNK_MIN_BYTES = 4 * 1024 * 1024
+# workers > 1: process pool seulement à partir de ce volume (taille sur disque des fichiers
+# sélectionnés); en dessous, lancer les process coûte plus que l'analyse séquentielle
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+
+
+def _last_line_end(f, start, size):
+    """Offset juste après le dernier \\n de [start, size) (start si aucun)."""
+    pos = size
+    while pos > start:
+        block_start = max(start, pos - 64 * 1024)
+        f.seek(block_start)
+        i = f.read(pos - block_start).rfind(b"\n")
+        if i != -1:
+            return block_start + i + 1
+        pos = block_start
+    return start
+
+
+def _split_byte_ranges(f, start, end, n_chunks):
+    """Coupe [start, end) en au plus n_chunks plages [a, b) qui commencent toutes en début de ligne."""
+    bounds = [start]
+    step = (end - start) // n_chunks
+    for i in range(1, n_chunks):
+        f.seek(start + i * step)
+        f.readline()  # resync sur la ligne suivante
+        b = min(f.tell(), end)
+        if b > bounds[-1]:
+            bounds.append(b)
+    if end > bounds[-1]:
+        bounds.append(end)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _analyze_range_job(file_path, start, end, start_dt, end_dt, interval, event_config):
+    """Job pour ProcessPoolExecutor: compte les lignes de la plage d'octets [start, end)."""
+    partial = _new_partial(event_config)
+    with open(file_path, "rb") as f:
+        _scan_lines(_iter_complete_lines(f, {"offset": start, "tail": b""}, end), partial,
+                    start_dt, end_dt, _build_keyword_matcher(event_config),
+                    _make_timestamp_decoder(interval))
+    return partial
+
+
+def _cache_key(file_path, interval, event_config):
+    sig = json.dumps([
+        ANALYSIS_CACHE_VERSION, os.path.abspath(file_path), interval, list(event_config.items()),
+    ])
+    return hashlib.sha1(sig.encode("utf-8")).hexdigest()
+
+
+def _partial_to_json(partial):
+    out = dict(partial)
+    out["first"] = partial["first"].isoformat() if partial["first"] else None
+    out["last"] = partial["last"].isoformat() if partial["last"] else None
+    return out
+
+
+def _partial_from_json(data):
+    partial = dict(data)
+    for group in ("counters", "languages"):
+        partial[group] = {label: defaultdict(int, c) for label, c in data[group].items()}
+    partial["first"] = datetime.fromisoformat(data["first"]) if data["first"] else None
+    partial["last"] = datetime.fromisoformat(data["last"]) if data["last"] else None
+    return partial
+
+
+def _load_cache_entry(cache_dir, key):
+    path = os.path.join(cache_dir, key + ".json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        entry["partial"] = _partial_from_json(entry["partial"])
+        os.utime(path)  # âge pour _prune_cache = dernière utilisation
+        return entry
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save_cache_entry(cache_dir, key, entry):
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        data = dict(entry)
+        data["partial"] = _partial_to_json(entry["partial"])
+        path = os.path.join(cache_dir, key + ".json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # cache best-effort
+
+
+def _prune_cache(cache_dir, max_age_days=CACHE_MAX_AGE_DAYS):
+    """Supprime les entrées pas utilisées depuis max_age_days (et les .tmp abandonnés)."""
+    cutoff = time.time() - max_age_days * 86400
+    try:
+        with os.scandir(cache_dir) as it:
+            for e in it:
+                try:
+                    if e.name.endswith((".json", ".tmp")) and e.stat().st_mtime < cutoff:
+                        os.remove(e.path)
+                except OSError:
+                    pass
+    except OSError:
+        pass  # pas encore de cache
+
+
+def _read_check_bytes(f, offset):
+    f.seek(max(0, offset - CACHE_CHECK_BYTES))
+    return f.read(min(offset, CACHE_CHECK_BYTES)).decode("latin-1")
+
+
+# Sidecar binaire écrit par DateBasedFileHandler(sidecar=True) (LOG_HANDLER/logs_v3.py):
+# log_...txt.rec = records (secondes locales, id message, payload) + table log_messages.jsonl
+# Les messages de la table sont des modèles: chiffres remplacés par MESSAGE_NUMBER_MARK
+SIDECAR_SUFFIX = ".rec"
+SIDECAR_DTYPE = [("t", "<i8"), ("id", "<i4"), ("payload", "<f8")]
+SIDECAR_SIZE_MARK = -2  # record de contrôle du handler (taille du .txt couvert), pas une ligne
+MESSAGES_FILE = "log_messages.jsonl"
+MESSAGE_NUMBER_MARK = "#"
+_TEMPLATE_UNSAFE = re.compile(r"[\d" + re.escape(MESSAGE_NUMBER_MARK) + "]")
+_MESSAGES_CACHE = {}  # chemin -> ((size, mtime_ns), {id: texte})
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _sidecar_path(file_path):
+    """Sidecar du fichier (.txt ou .txt.gz) s'il existe et est au moins aussi récent que le texte, sinon None."""
+    base = file_path[:-3] if is_gzip_log(file_path) else file_path
+    side_path = base + SIDECAR_SUFFIX
+    try:
+        if os.stat(side_path).st_mtime_ns >= os.stat(file_path).st_mtime_ns:
+            return side_path
+    except OSError:
+        pass
+    return None
+
+
+def _load_messages(folder):
+    """Table id -> texte du dossier, relue seulement si log_messages.jsonl a changé."""
+    path = os.path.join(folder, MESSAGES_FILE)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return {}
+    sig = (st.st_size, st.st_mtime_ns)
+    cached = _MESSAGES_CACHE.get(path)
+    if cached is not None and cached[0] == sig:
+        return cached[1]
+
+    messages = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                msg_id, text = json.loads(line)
+            except ValueError:
+                continue  # ligne tronquée
+            messages[msg_id] = text
+    _MESSAGES_CACHE[path] = (sig, messages)
+    return messages
 
-    ui_restart_counter = 0
-    arduino_disconnect_counter = 0
-    arduino_error_parsing_counter = 0
 
-    ui_restart_keywords = [
-        "Starting Hydrogen Rocket UI",
-        "Starting Horse Power UI",
-        "Starting Air Pressure UI",
-        "Starting Jumping Ring UI",
-        "Starting Light a Fire UI"
-    ]
-    #arduino_disconnect_keyword = "Error reading from serial, Arduino probably disconnected"
-    arduino_disconnect_keyword = "Arduino disconnected. Trying to reconnect to Arduino..."
+def _keywords_match_templates(event_config):
+    """
+    True si matcher le modèle d'un message (chiffres masqués) revient à matcher son texte:
+    aucun mot-clé ne contient de chiffre ni MESSAGE_NUMBER_MARK.
+    """
+    keywords = [*event_config.values(), *LANGUAGE_KEYWORDS.values(), ERROR_PARSING_KEYWORD,
+                *UI_RESTART_KEYWORDS, ARDUINO_DISCONNECT_KEYWORD]
+    return not any(_TEMPLATE_UNSAFE.search(keyword) for keyword in keywords)
 
-    any_data_found = False
-    first_dt = None
-    last_dt = None
 
+def _analyze_sidecar(side_path, messages, start_dt, end_dt, interval, event_config, match_keywords):
+    """
+    Compte un fichier depuis son sidecar binaire, avec NumPy (même partial que _scan_lines):
+      - le matcher de mots-clés tourne une fois par modèle de message, pas par ligne
+      - buckets jour / heure et plage 9h30-18h par arithmétique entière sur les secondes
+    Retourne None si le sidecar est inutilisable (NumPy absent, id inconnu, mot-clé avec
+    chiffres qu'un modèle ne peut pas matcher) -> lecture du texte.
+    """
+    if not _keywords_match_templates(event_config):
+        return None
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+
+    dtype = np.dtype(SIDECAR_DTYPE)
+    with open(side_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        records = np.fromfile(f, dtype=dtype, count=size // dtype.itemsize)  # record final tronqué ignoré
+    records = records[records["id"] != SIDECAR_SIZE_MARK]
+
+    lo = calendar.timegm(start_dt.timetuple()) + (1 if start_dt.microsecond else 0)
+    hi = calendar.timegm(end_dt.timetuple())
+    t = records["t"]
+    keep = (t >= lo) & (t <= hi)
+    t = t[keep]
+    ids = records["id"][keep]
+
+    partial = _new_partial(event_config)
+    if t.size == 0:
+        return partial
+    uniq, inverse = np.unique(ids, return_inverse=True)
+    if uniq[0] < 0 or any(msg_id not in messages for msg_id in uniq.tolist()):
+        return None
+
+    partial["first"] = _EPOCH + timedelta(seconds=int(t.min()))
+    partial["last"] = _EPOCH + timedelta(seconds=int(t.max()))
+
+    # cibles touchées par chaque message distinct -> indices dans uniq
+    targets = defaultdict(list)
+    for k, msg_id in enumerate(uniq.tolist()):
+        for target in match_keywords(messages[msg_id].lower()):
+            targets[target].append(k)
+    if not targets:
+        return partial
+
+    bucket_s = 3600 if interval == "hour" else 86400
+    buckets = t // bucket_s
+    second_of_day = t % 86400
+    in_day_hours = ((second_of_day >= HOUR_BEGIN_DAY * 3600 + MINUTE_BEGIN_DAY * 60)
+                    & (second_of_day < HOUR_END_DAY * 3600))
+
+    for (kind, label), ks in targets.items():
+        mask = np.isin(inverse, ks)
+        if kind in ("event", "lang"):
+            keys, first_idx, counts = np.unique(buckets[mask], return_index=True, return_counts=True)
+            counter = partial["counters" if kind == "event" else "languages"][label]
+            # ordre des clés = ordre de première apparition (comme le parcours du texte)
+            for j in np.argsort(first_idx, kind="stable").tolist():
+                time_key = get_time_key(_EPOCH + timedelta(seconds=int(keys[j]) * bucket_s), interval)
+                counter[time_key] += int(counts[j])
+            partial["any_data"] = partial["any_data"] or keys.size > 0
+        elif kind == "parse_error":
+            n = int(mask.sum())
+            partial["parse_error"] += n
+            partial["any_data"] = partial["any_data"] or n > 0
+        elif kind == "ui_restart":
+            partial["ui_restart"] += int((mask & in_day_hours).sum())
+        else:
+            partial["arduino_disconnect"] += int((mask & in_day_hours).sum())
+    return partial
+
+
+def _analyze_file(file_path, start_dt, end_dt, interval, event_config,
+                  match_keywords, decode_timestamp, cache_dir=None, pool=None, workers=1):
+    """
+    Compte un fichier -> partial.
+    Avec cache_dir: partial du fichier ENTIER (indépendant de la fenêtre), repris là où il
+    s'était arrêté (on ne parse que la fin ajoutée). Réutilisé tel quel quand toutes les lignes
+    datées du fichier sont dans [start_dt, end_dt] -> élargir la fenêtre ne reparse que les
+    fichiers de bord. Un fichier à cheval sur une borne est compté sans cache (seek + parse).
+    Avec pool: la partie à parser est coupée en plages d'octets comptées en parallèle,
+    puis fusionnées dans l'ordre du fichier.
+    Sidecar binaire .rec à jour: comptage NumPy sans lire le texte (voir _analyze_sidecar).
+    """
+    # plage du nom hors intervalle -> ni sidecar ni texte à lire
+    if not name_overlaps(file_path, start_dt, end_dt):
+        return _new_partial(event_config)
+
+    # sidecar binaire à jour (DateBasedFileHandler sidecar=True) -> comptage NumPy, texte pas relu
+    side_path = _sidecar_path(file_path)
+    if side_path is not None:
+        partial = _analyze_sidecar(side_path, _load_messages(os.path.dirname(file_path)),
+                                   start_dt, end_dt, interval, event_config, match_keywords)
+        if partial is not None:
+            return partial
+
+    # index sidecar: fichier entièrement hors intervalle -> pas besoin de le lire
+    if not file_overlaps(file_path, start_dt, end_dt):
+        return _new_partial(event_config)
+
+    if cache_dir and _may_fit_window(file_path, start_dt, end_dt):
+        key = _cache_key(file_path, interval, event_config)
+        if is_gzip_log(file_path):
+            partial = _analyze_gzip_file(file_path, ALL_TIME[0], ALL_TIME[1], event_config,
+                                         match_keywords, decode_timestamp, cache_dir, key)
+        else:
+            partial = _analyze_text_file(file_path, ALL_TIME[0], ALL_TIME[1], interval, event_config,
+                                         match_keywords, decode_timestamp, cache_dir, key, pool, workers)
+        if partial["first"] is None or (start_dt <= partial["first"] and partial["last"] <= end_dt):
+            return partial
+
+    if is_gzip_log(file_path):
+        return _analyze_gzip_file(file_path, start_dt, end_dt, event_config,
+                                  match_keywords, decode_timestamp)
+    return _analyze_text_file(file_path, start_dt, end_dt, interval, event_config,
+                              match_keywords, decode_timestamp, pool=pool, workers=workers)
+
+
+def _may_fit_window(file_path, start_dt, end_dt):
+    """
+    Toutes les lignes datées du fichier sont-elles (probablement) dans [start_dt, end_dt] ?
+    Index .idx (min / max exacts) si disponible, sinon plage du nom; vérifié ensuite sur le partial.
+    """
+    index = load_index(file_path)
+    if index is not None:
+        if index["min"] is None:
+            return True
+        return (index["min"] >= start_dt.strftime("%Y-%m-%d %H:%M:%S")
+                and index["max"] <= end_dt.strftime("%Y-%m-%d %H:%M:%S"))
+    name_start, name_end = file_date_range(file_path)
+    if name_start is None:
+        return True  # petit fichier sans plage connue: le parser en entier coûte peu
+    return name_start >= start_dt.date() and (name_end or name_start) <= end_dt.date()
+
+
+def _analyze_text_file(file_path, start_dt, end_dt, interval, event_config, match_keywords,
+                       decode_timestamp, cache_dir=None, key=None, pool=None, workers=1):
+    """
+    Fichier texte: seek sur start_dt puis parse (en plages parallèles si pool).
+    Avec key: reprise depuis l'entrée de cache (offset atteint) et sauvegarde du nouvel état.
+    """
+    st = os.stat(file_path)
+
+    with open(file_path, "rb") as f:
+        entry = _load_cache_entry(cache_dir, key) if key else None
+        if entry is not None:
+            unchanged = entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns
+            grown = (st.st_size >= entry["offset"]
+                     and _read_check_bytes(f, entry["offset"]) == entry["check"])
+            if not (unchanged or grown):
+                entry = None  # tronqué / remplacé (rotation) -> on repart de zéro
+
+        if entry is not None:
+            partial = entry["partial"]
+            cursor = {"offset": entry["offset"], "tail": b""}
+        else:
+            partial = _new_partial(event_config)
+            cursor = {"offset": find_log_offset(file_path, f, start_dt) if start_dt > ALL_TIME[0] else 0,
+                      "tail": b""}
+
+        if entry is None or entry["size"] != st.st_size or entry["mtime_ns"] != st.st_mtime_ns:
+            if pool is not None and st.st_size - cursor["offset"] >= 2 * CHUNK_MIN_BYTES:
+                end = _last_line_end(f, cursor["offset"], st.st_size)
+                n_chunks = min(workers * 4, (end - cursor["offset"]) // CHUNK_MIN_BYTES)
+                ranges = _split_byte_ranges(f, cursor["offset"], end, max(1, n_chunks))
+                for chunk_partial in pool.map(
+                        _analyze_range_job, repeat(file_path), [a for a, _ in ranges], [b for _, b in ranges],
+                        repeat(start_dt), repeat(end_dt), repeat(interval), repeat(event_config)):
+                    _merge_partial(partial, chunk_partial)
+                cursor["offset"] = end
+                f.seek(end)
+                cursor["tail"] = f.read(st.st_size - end)
+            else:
+                _scan_lines(_iter_complete_lines(f, cursor), partial, start_dt, end_dt,
+                            match_keywords, decode_timestamp)
+            if key:
+                _save_cache_entry(cache_dir, key, {
+                    "size": st.st_size,
+                    "mtime_ns": st.st_mtime_ns,
+                    "offset": cursor["offset"],
+                    "check": _read_check_bytes(f, cursor["offset"]),
+                    "partial": partial,
+                })
+        else:
+            f.seek(cursor["offset"])
+            cursor["tail"] = f.read(st.st_size - cursor["offset"])
+
+    # dernière ligne sans \n: comptée pour ce run, mais pas dans le cache
+    if cursor["tail"]:
+        partial = copy.deepcopy(partial)
+        _scan_lines(_decode_log_line(cursor["tail"]), partial, start_dt, end_dt,
+                    match_keywords, decode_timestamp)
+    return partial
+
+
+def _analyze_gzip_file(file_path, start_dt, end_dt, event_config,
+                       match_keywords, decode_timestamp, cache_dir=None, key=None):
+    """
+    Segment archivé .txt.gz: lecture séquentielle avec décompression en streaming
+    (pas de seek ni de plages d'octets). Fichier finalisé -> cache valable tant qu'il est inchangé.
+    """
+    st = os.stat(file_path)
+    entry = _load_cache_entry(cache_dir, key) if key else None
+    if entry is not None and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+        return entry["partial"]
+
+    partial = _new_partial(event_config)
+    with open_log(file_path) as f:
+        _scan_lines(f, partial, start_dt, end_dt, match_keywords, decode_timestamp)
+    if key:
+        _save_cache_entry(cache_dir, key, {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "offset": st.st_size,
+            "check": "",
+            "partial": partial,
+        })
+    return partial
+
+
+def _analyze_file_job(file_path, start_dt, end_dt, interval, event_config, cache_dir):
+    """Job pour ProcessPoolExecutor (matcher / décodeur recompilés dans le process worker)."""
+    return _analyze_file(file_path, start_dt, end_dt, interval, event_config,
+                         _build_keyword_matcher(event_config), _make_timestamp_decoder(interval),
+                         cache_dir=cache_dir)
+
+
+def analyze_logs(files, start_dt, end_dt, interval, event_config, project_name,
+                 cache_dir=None, workers=None):
+    """
+    cache_dir (opt-in, ex: ANALYSIS_CACHE_DIR): partials par fichier réutilisés d'une analyse
+    à l'autre (voir _analyze_file); entrées inutilisées depuis CACHE_MAX_AGE_DAYS supprimées.
+    workers > 1: les fichiers sont répartis sur un ProcessPoolExecutor, chaque worker
+    renvoie un partial, fusionnés ensuite dans l'ordre des fichiers (résultat identique au séquentiel).
+    Un seul fichier sélectionné (ex: gros LOG annuel): il est coupé en plages d'octets
+    alignées sur les lignes, comptées en parallèle.
+    Sous PARALLEL_MIN_BYTES au total, analyse séquentielle même avec workers > 1.
+    """
+    selected = []
     for file_path in files:
         print(f"\nReading file: {file_path}")
         if not os.path.isfile(file_path):
             print(f"File not found: {file_path}", file=sys.stderr)
             continue
+        selected.append(file_path)
+
+    if cache_dir:
+        _prune_cache(cache_dir)
+
+    if workers and workers > 1 and sum(os.path.getsize(p) for p in selected) < PARALLEL_MIN_BYTES:
+        workers = None  # petit volume: pas de process pool
+    if workers and workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+    if workers and workers > 1 and len(selected) == 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = [_analyze_file(
+                selected[0], start_dt, end_dt, interval, event_config,
+                _build_keyword_matcher(event_config), _make_timestamp_decoder(interval),
+                cache_dir=cache_dir, pool=pool, workers=workers
+            )]
+    elif workers and workers > 1 and len(selected) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(selected))) as pool:
+            partials = list(pool.map(
+                _analyze_file_job, selected, repeat(start_dt), repeat(end_dt),
+                repeat(interval), repeat(event_config), repeat(cache_dir)
+            ))
+    else:
+        match_keywords = _build_keyword_matcher(event_config)
+        decode_timestamp = _make_timestamp_decoder(interval)
+        partials = (
+            _analyze_file(file_path, start_dt, end_dt, interval, event_config,
+                          match_keywords, decode_timestamp, cache_dir=cache_dir)
+            for file_path in selected
+        )
 
-        with open(file_path, "r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    timestamp_str = line.split(" - ")[0]
-                    timestamp = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-
-                    if not (start_dt <= timestamp <= end_dt):
-                        continue
-
-                    if first_dt is None or timestamp < first_dt:
-                        first_dt = timestamp
-                    if last_dt is None or timestamp > last_dt:
-                        last_dt = timestamp
-
-                    time_key = get_time_key(timestamp, interval)
-                    line_lower = line.lower()
-
-                    for label, keyword in event_config.items():
-                        if keyword.lower() in line_lower:
-                            counters[label][time_key] += 1
-                            any_data_found = True
-
-                    if "your language is: english" in line_lower:
-                        language_eng_counter[time_key] += 1
-                        any_data_found = True
-                    if "your language is: hebrew" in line_lower:
-                        language_heb_counter[time_key] += 1
-                        any_data_found = True
-                    if "your language is: arabic" in line_lower:
-                        language_arb_counter[time_key] += 1
-                        any_data_found = True
-
-                    if "Error parsing data:".lower() in line_lower:
-                        arduino_error_parsing_counter += 1
-                        any_data_found = True
-
-                    if (timestamp.hour > HOUR_BEGIN_DAY or (
-                            timestamp.hour == HOUR_BEGIN_DAY and timestamp.minute >= MINUTE_BEGIN_DAY)) and timestamp.hour < HOUR_END_DAY:
-
-                        for keyword in ui_restart_keywords:
-                            if keyword.lower() in line_lower:
-                                ui_restart_counter += 1
-                                break
-                        if arduino_disconnect_keyword.lower() in line_lower:
-                            arduino_disconnect_counter += 1
-
-                except Exception:
-                    print(f"Skipping line (parse error): {line.rstrip()}", file=sys.stderr)
+    # reduce déterministe: ordre des fichiers. Pas de fusion k-way par timestamp entre segments
+    # qui se chevauchent: chaque ligne compte dans le bucket de SON timestamp, first / last sont
+    # des min / max et plot_counts trie les clés -> même résultat quel que soit l'ordre des lignes.
+    total = _new_partial(event_config)
+    for partial in partials:
+        _merge_partial(total, partial)
 
-    if not any_data_found:
+    if not total["any_data"]:
         return None
 
-    counters["Language: English"] = language_eng_counter
-    counters["Language: Hebrew"] = language_heb_counter
-    counters["Language: Arabic"] = language_arb_counter
+    counters = total["counters"]
+    for label, lang_counter in total["languages"].items():
+        counters[label] = lang_counter
 
     return {
         "counters": counters,
-        "First Timestamp": first_dt,
-        "Last Timestamp": last_dt,
+        "First Timestamp": total["first"],
+        "Last Timestamp": total["last"],
         "project_name": project_name,
-        "ui_restart_count": ui_restart_counter,
-        "arduino_disconnect_count": arduino_disconnect_counter,
-        "Error parsing data": arduino_error_parsing_counter
+        "ui_restart_count": total["ui_restart"],
+        "arduino_disconnect_count": total["arduino_disconnect"],
+        "Error parsing data": total["parse_error"]
     }
 
 
@@ -631,6 +1287,9 @@ def plot_counts(data_dict, interval):
         print("⚠️ Aucun point de donnée à tracer.")
         return None
 
+    import numpy as np
+    import matplotlib.pyplot as plt
+
     x = np.arange(len(all_keys))
     offset = 0
 
@@ -0,0 +1,323 @@
+import gzip
+import io
+import json
+import os
+import re
+from bisect import bisect_left
+from datetime import datetime
+
+# Lignes de log: "YYYY-MM-DD HH:MM:SS - message" (DateBasedFileHandler / split_log.py)
+TS_LEN = 19
+
+# En dessous de cette fenêtre, on arrête la dichotomie et on lit linéairement
+MIN_BISECT_SPAN = 64 * 1024
+# Nb max de lignes sans timestamp lues après un point de sonde
+MAX_PROBE_LINES = 64
+
+# Index "sidecar": log_....txt -> log_....txt.idx (1 checkpoint par heure)
+# Construit (lecture complète, une fois) seulement pour les gros fichiers relus d'une analyse
+# à l'autre; en dessous, la dichotomie (quelques seek) suffit.
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+MIN_INDEX_SIZE = 8 * 1024 * 1024
+# Index déjà chargés dans ce process: chemin -> index (valide tant que taille + mtime inchangés)
+_INDEX_MEMO = {}
+PAT_TS_BYTES = re.compile(rb"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
+
+# Noms des logs: log_YYYY-MM-DD[(idx)][_to_YYYY-MM-DD].txt[.gz] (DateBasedFileHandler / split_log.py)
+PAT_LOG_NAME = re.compile(
+    r"^log_(\d{4}-\d{2}-\d{2})(?:\(\d+\))?(?:_to_(\d{4}-\d{2}-\d{2}))?\.txt(?:\.gz)?$", re.IGNORECASE
+)
+
+# Segments archivés par DateBasedFileHandler (compress=True): log_....txt.gz
+GZIP_SUFFIX = ".gz"
+
+
+def is_gzip_log(path):
+    return str(path).lower().endswith(GZIP_SUFFIX)
+
+
+def open_log(path, encoding="utf-8", errors="strict"):
+    """Ouvre un log en mode texte; un .gz est décompressé en streaming (jamais en entier en mémoire)."""
+    if is_gzip_log(path):
+        return gzip.open(path, "rt", encoding=encoding, errors=errors)
+    return open(path, "r", encoding=encoding, errors=errors)
+
+
+def parse_line_ts(raw_line: bytes):
+    """Parse rapide du préfixe 'YYYY-MM-DD HH:MM:SS' d'une ligne (bytes). Retourne datetime ou None."""
+    if len(raw_line) < TS_LEN:
+        return None
+    p = raw_line[:TS_LEN]
+    if p[4:5] != b"-" or p[7:8] != b"-" or p[10:11] != b" " or p[13:14] != b":" or p[16:17] != b":":
+        return None
+    digits = p[0:4] + p[5:7] + p[8:10] + p[11:13] + p[14:16] + p[17:19]
+    if not digits.isdigit():
+        return None
+    try:
+        return datetime(
+            int(p[0:4]), int(p[5:7]), int(p[8:10]),
+            int(p[11:13]), int(p[14:16]), int(p[17:19])
+        )
+    except ValueError:
+        return None
+
+
+def file_date_range(path):
+    """
+    (date_début, date_fin) d'après le nom du fichier, (None, None) si nom inattendu.
+    date_fin None = segment encore ouvert (sans _to_): seule la borne basse est connue.
+    """
+    m = PAT_LOG_NAME.match(os.path.basename(str(path)))
+    if not m:
+        return None, None
+    try:
+        start = datetime.strptime(m.group(1), "%Y-%m-%d").date()
+        end = datetime.strptime(m.group(2), "%Y-%m-%d").date() if m.group(2) else None
+    except ValueError:
+        return None, None
+    return start, end
+
+
+def _next_timestamp(f):
+    """Depuis la position courante (début de ligne), retourne (offset, dt) de la prochaine ligne datée."""
+    for _ in range(MAX_PROBE_LINES):
+        pos = f.tell()
+        raw_line = f.readline()
+        if not raw_line:
+            return None, None
+        dt = parse_line_ts(raw_line)
+        if dt is not None:
+            return pos, dt
+    return None, None
+
+
+def find_start_offset(f, start_dt):
+    """
+    Dichotomie sur les offsets (fichier ouvert en 'rb') pour trouver un début de ligne
+    à partir duquel lire: toutes les lignes avant l'offset retourné sont < start_dt.
+      - après chaque seek on se resynchronise sur la ligne suivante
+      - si les sondes ne sont pas chronologiques -> 0 (lecture linéaire complète)
+    Le lecteur doit toujours filtrer dt < start_dt (l'offset est une borne basse).
+    """
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+
+    f.seek(0)
+    first_pos, first_dt = _next_timestamp(f)
+    if first_dt is None or first_dt >= start_dt:
+        return 0
+
+    probes = [(first_pos, first_dt)]
+    lo, hi = first_pos, size
+    while hi - lo > MIN_BISECT_SPAN:
+        mid = (lo + hi) // 2
+        f.seek(mid)
+        f.readline()  # resync: fin de la ligne coupée
+        pos, dt = _next_timestamp(f)
+        if dt is None:
+            hi = mid
+            continue
+
+        # contenu non chronologique -> fallback linéaire
+        for p_pos, p_dt in probes:
+            if (p_pos < pos and p_dt > dt) or (p_pos > pos and p_dt < dt):
+                return 0
+        probes.append((pos, dt))
+
+        if dt < start_dt:
+            lo = pos
+        else:
+            hi = mid
+
+    return lo
+
+
+def _new_index():
+    return {
+        "version": INDEX_VERSION,
+        "size": 0,
+        "mtime_ns": 0,
+        "indexed_to": 0,     # offset après la dernière ligne complète indexée
+        "chronological": True,
+        "min": None,
+        "max": None,
+        "last": None,
+        "checkpoints": [],   # [["YYYY-MM-DD HH:MM:SS", offset], ...] première ligne de chaque heure
+    }
+
+
+def _scan_checkpoints(f, index):
+    """Lit depuis index['indexed_to'] et ajoute un checkpoint à chaque nouvelle heure."""
+    pos = index["indexed_to"]
+    f.seek(pos)
+
+    last = index["last"].encode("ascii") if index["last"] else None
+    last_hour = last[:13] if last else None
+    lo = index["min"].encode("ascii") if index["min"] else None
+    hi = index["max"].encode("ascii") if index["max"] else None
+    checkpoints = index["checkpoints"]
+    chronological = index["chronological"]
+
+    for raw_line in f:
+        if not raw_line.endswith(b"\n"):
+            break  # ligne en cours d'écriture: on la reprendra au prochain passage
+        if PAT_TS_BYTES.match(raw_line):
+            ts = raw_line[:TS_LEN]
+            if ts[:13] != last_hour and parse_line_ts(raw_line) is not None:
+                checkpoints.append([ts.decode("ascii"), pos])
+                last_hour = ts[:13]
+            if last is not None and ts < last:
+                chronological = False
+            if lo is None or ts < lo:
+                lo = ts
+            if hi is None or ts > hi:
+                hi = ts
+            last = ts
+        pos += len(raw_line)
+
+    index["indexed_to"] = pos
+    index["chronological"] = chronological
+    index["last"] = last.decode("ascii") if last else None
+    index["min"] = lo.decode("ascii") if lo else None
+    index["max"] = hi.decode("ascii") if hi else None
+
+
+def _index_still_valid(f, index, size):
+    """Le début du fichier est-il celui qui a été indexé ? (sinon: fichier remplacé / tronqué)"""
+    end = index["indexed_to"]
+    if size < end:
+        return False
+    if end > 0:
+        f.seek(end - 1)
+        if f.read(1) != b"\n":
+            return False
+    if index["checkpoints"]:
+        ts, offset = index["checkpoints"][-1]
+        f.seek(offset)
+        if f.read(TS_LEN) != ts.encode("ascii"):
+            return False
+    return True
+
+
+def load_index(path):
+    """
+    Retourne l'index (dict) du fichier, en le construisant / complétant si besoin:
+      - même taille + même mtime -> sidecar utilisé tel quel
+      - fichier qui a grandi (append) -> on indexe seulement la fin
+      - fichier tronqué / remplacé (rotation) -> reconstruction complète
+    Retourne None sous MIN_INDEX_SIZE (dichotomie), pour les .gz (pas d'accès
+    aléatoire: lecture en streaming) ou en cas d'erreur.
+    Le .idx n'est relu qu'une fois par process (_INDEX_MEMO), pas à chaque appel.
+    """
+    if is_gzip_log(path):
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if st.st_size < MIN_INDEX_SIZE:
+        return None
+
+    index = _INDEX_MEMO.get(str(path))
+    if index is not None and index["size"] == st.st_size and index["mtime_ns"] == st.st_mtime_ns:
+        return index
+
+    idx_path = str(path) + INDEX_SUFFIX
+    index = None
+    try:
+        with open(idx_path, "r", encoding="utf-8") as fi:
+            index = json.load(fi)
+        if index.get("version") != INDEX_VERSION:
+            index = None
+    except (OSError, ValueError):
+        index = None
+
+    if index is not None and index["size"] == st.st_size and index["mtime_ns"] == st.st_mtime_ns:
+        _INDEX_MEMO[str(path)] = index
+        return index
+
+    try:
+        with open(path, "rb") as f:
+            if index is None or not _index_still_valid(f, index, st.st_size):
+                index = _new_index()
+            _scan_checkpoints(f, index)
+    except OSError:
+        return None
+
+    index["size"] = st.st_size
+    index["mtime_ns"] = st.st_mtime_ns
+    try:
+        tmp_path = idx_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fo:
+            json.dump(index, fo)
+        os.replace(tmp_path, idx_path)
+    except OSError:
+        pass  # dossier en lecture seule: index gardé en mémoire seulement
+    _INDEX_MEMO[str(path)] = index
+    return index
+
+
+def index_offset(index, start_dt):
+    """Offset du dernier checkpoint < start_dt (0 si aucun ou contenu non chronologique)."""
+    if not index["chronological"]:
+        return 0
+    key = start_dt.strftime("%Y-%m-%d %H:%M:%S")
+    i = bisect_left([ts for ts, _ in index["checkpoints"]], key) - 1
+    return index["checkpoints"][i][1] if i >= 0 else 0
+
+
+def name_overlaps(path, start_dt, end_dt):
+    """False seulement si la plage du nom (file_date_range) est hors de [start_dt, end_dt]."""
+    name_start, name_end = file_date_range(path)
+    if name_start is not None:
+        if end_dt is not None and name_start > end_dt.date():
+            return False
+        if name_end is not None and start_dt is not None and name_end < start_dt.date():
+            return False
+    return True
+
+
+def file_overlaps(path, start_dt, end_dt):
+    """
+    False seulement si le nom (plage _to_) ou l'index prouve qu'aucune ligne datée du fichier
+    n'est dans [start_dt, end_dt]. (sans plage ni index -> True: le fichier sera lu)
+    """
+    # Nom d'abord: pas besoin de construire l'index (segments d'un jour avec rotate_daily)
+    if not name_overlaps(path, start_dt, end_dt):
+        return False
+
+    index = load_index(path)
+    if index is None or index["min"] is None:
+        return True
+    if end_dt is not None and index["min"] > end_dt.strftime("%Y-%m-%d %H:%M:%S"):
+        return False
+    if start_dt is not None and index["max"] < start_dt.strftime("%Y-%m-%d %H:%M:%S"):
+        return False
+    return True
+
+
+def find_log_offset(path, f, start_dt):
+    """Offset de départ pour start_dt: index sidecar si disponible, sinon dichotomie sur f ('rb')."""
+    index = load_index(path)
+    if index is not None:
+        return index_offset(index, start_dt)
+    return find_start_offset(f, start_dt)
+
+
+def open_log_from(path, start_dt, encoding="utf-8", errors="strict"):
+    """
+    Ouvre un log en mode texte, positionné sur la première ligne utile pour start_dt
+    (ou au début du fichier si start_dt est None / contenu non chronologique).
+    Un .gz est lu depuis le début (décompression en streaming, pas de seek).
+    """
+    if is_gzip_log(path):
+        return open_log(path, encoding=encoding, errors=errors)
+    raw = open(path, "rb")
+    try:
+        if start_dt is not None:
+            raw.seek(find_log_offset(path, raw, start_dt))
+        return io.TextIOWrapper(raw, encoding=encoding, errors=errors)
+    except Exception:
+        raw.close()
+        raise
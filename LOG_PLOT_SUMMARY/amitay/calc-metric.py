@@ -1,11 +1,9 @@
 import argparse
 from datetime import datetime
 from collections import defaultdict
-import matplotlib.pyplot as plt
 import sys
 import re
 import os
-import numpy as np
 
 FILE_PATH = ""
 INTERVAL = "day" # "day" or "hour"
@@ -156,6 +154,10 @@ def write_summary(data_dict, interval, start_dt, end_dt):
 
 
 def plot_and_save_counts(data_dict, interval, start_dt, end_dt):
+    # heavy imports only when a plot is actually produced (fast CLI startup)
+    import matplotlib.pyplot as plt
+    import numpy as np
+
     all_keys = sorted(set().union(*[counter.keys() for counter in data_dict.values()]))
     x = np.arange(len(all_keys))
 
@@ -0,0 +1,125 @@
+"""
+Micro-benchmark du parsing des lignes brutes Arduino ("<ms> ms ; <message>") du splitter
+(VERSION_6/Chliran_log/split_log.py, identique pour Pendulum):
+  - regex     : PAT_TS.search + PAT_INIT.search + extract_message (ancienne boucle)
+  - tokenizer : parse_raw_line + clean_message
+
+Un LOG.TXT synthétique (10M lignes par défaut: messages, Init, reboots, quelques lignes
+malformées) est généré dans un dossier temporaire, puis lu en streaming pour chaque méthode.
+"lecture seule" = itération des lignes sans parsing (coût commun aux deux).
+Les résultats des deux méthodes sont ensuite comparés ligne à ligne (passe non chronométrée).
+
+Usage:
+    python bench_split_parse.py [-n 10000000] [--log chemin/LOG.TXT] [--keep]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from itertools import zip_longest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SPLIT_DIR = os.path.join(HERE, "VERSION_6", "Chliran_log")
+sys.path.insert(0, SPLIT_DIR)
+
+import split_log  # noqa: E402
+
+MESSAGES = ["Ball released", "Sensor A: 512", "Language: Hebrew", "Button pressed", "Light ON"]
+
+
+def _generate(path, n, seed=0):
+    """LOG.TXT synthétique de n lignes."""
+    rnd = random.Random(seed)
+    t = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        lines = []
+        for _ in range(n):
+            r = rnd.random()
+            if r < 0.001:
+                t = rnd.randint(0, 5000)  # reboot
+                lines.append(f"{t} ms ; Init\r\n")
+            elif r < 0.002:
+                lines.append("?? corrupted ; 12 ms ; x\r\n")  # malformée -> fallback regex
+            else:
+                t += rnd.randint(0, 20000)
+                lines.append(f"{t} ms ; {rnd.choice(MESSAGES)}\r\n")
+            if len(lines) >= 100000:
+                f.write("".join(lines))
+                lines.clear()
+        f.write("".join(lines))
+
+
+def _iter_read_only(path):
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            yield line
+
+
+def _iter_regex(path):
+    pat_ts, pat_init, extract = split_log.PAT_TS, split_log.PAT_INIT, split_log.extract_message
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            m = pat_ts.search(line)
+            if not m:
+                continue
+            yield int(m.group(1)), pat_init.search(line) is not None, extract(line)
+
+
+def _iter_tokenizer(path):
+    parse, clean = split_log.parse_raw_line, split_log.clean_message
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            parsed = parse(line)
+            if parsed is None:
+                continue
+            raw_time, is_init, message = parsed
+            yield raw_time, is_init, clean(message)
+
+
+def _timed(iter_func, path):
+    """(secondes, nb d'éléments) pour consommer iter_func(path) sans rien garder en mémoire."""
+    count = 0
+    t0 = time.perf_counter()
+    for _ in iter_func(path):
+        count += 1
+    return time.perf_counter() - t0, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark parse des lignes LOG.TXT (regex vs tokenizer).")
+    parser.add_argument("-n", type=int, default=10_000_000, help="Nb de lignes générées (défaut: 10000000).")
+    parser.add_argument("--log", help="LOG.TXT existant à utiliser (pas de génération).")
+    parser.add_argument("--keep", action="store_true", help="Garde le LOG.TXT généré.")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    path = args.log
+    if path is None:
+        tmp_dir = tempfile.mkdtemp(prefix="bench_split_")
+        path = os.path.join(tmp_dir, "LOG.TXT")
+        t0 = time.perf_counter()
+        _generate(path, args.n)
+        print(f"LOG.TXT généré: {args.n:,} lignes, {os.path.getsize(path) / 1e6:.0f} Mo "
+              f"({time.perf_counter() - t0:.1f} s) -> {path}")
+
+    try:
+        t_read, lines = _timed(_iter_read_only, path)
+        t_regex, _ = _timed(_iter_regex, path)
+        t_tok, _ = _timed(_iter_tokenizer, path)
+        same = all(a == b for a, b in zip_longest(_iter_regex(path), _iter_tokenizer(path)))
+        per_line = 1e9 / max(lines, 1)
+        print(f"{'lecture seule':<14} {t_read:7.2f} s  {t_read * per_line:6.0f} ns/ligne")
+        print(f"{'regex':<14} {t_regex:7.2f} s  {t_regex * per_line:6.0f} ns/ligne")
+        print(f"{'tokenizer':<14} {t_tok:7.2f} s  {t_tok * per_line:6.0f} ns/ligne")
+        print(f"parsing seul: x{(t_regex - t_read) / max(t_tok - t_read, 1e-9):.2f} | "
+              f"résultats identiques: {same}")
+    finally:
+        if tmp_dir is not None and not args.keep:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
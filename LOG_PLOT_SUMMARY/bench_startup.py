@@ -0,0 +1,86 @@
+"""
+Benchmark du temps de démarrage:
+  - VERSION_6/Gui_log_analyzers.py : import du module + fenêtre Tk affichée (root.update())
+  - amitay/calc-metric.py          : CLI jusqu'à argparse (--help)
+
+Chaque cible est lancée dans un nouveau process Python (imports à froid côté interpréteur),
+on affiche min / médiane / max sur N runs.
+
+Usage:
+    python bench_startup.py [-n 10] [--importtime]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GUI_DIR = os.path.join(HERE, "VERSION_6")
+CALC_METRIC = os.path.join(HERE, "amitay", "calc-metric.py")
+
+GUI_IMPORT_CODE = (
+    "import sys; sys.path.insert(0, {gui_dir!r}); import Gui_log_analyzers"
+)
+GUI_WINDOW_CODE = (
+    "import sys; sys.path.insert(0, {gui_dir!r});"
+    "import tkinter as tk; import Gui_log_analyzers as g;"
+    "root = tk.Tk(); app = g.LogAnalyzerGUI(root); root.update(); root.destroy()"
+)
+
+
+def _targets():
+    return {
+        "GUI import": [sys.executable, "-c", GUI_IMPORT_CODE.format(gui_dir=GUI_DIR)],
+        "GUI window shown": [sys.executable, "-c", GUI_WINDOW_CODE.format(gui_dir=GUI_DIR)],
+        "calc-metric --help": [sys.executable, CALC_METRIC, "--help"],
+    }
+
+
+def _time_once(cmd):
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - t0
+    if proc.returncode != 0:
+        last = proc.stderr.strip().splitlines()[-1:] or ["?"]
+        raise RuntimeError(last[0])
+    return elapsed
+
+
+def _top_imports(cmd, top=10):
+    """Les imports les plus coûteux (python -X importtime), en ms cumulées."""
+    proc = subprocess.run([cmd[0], "-X", "importtime"] + cmd[1:],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumul_us, name = [p.strip() for p in line[len("import time:"):].split("|")]
+        rows.append((int(cumul_us), name))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup benchmark (GUI + calc-metric).")
+    parser.add_argument("-n", type=int, default=10, help="Nombre de runs par cible (défaut: 10).")
+    parser.add_argument("--importtime", action="store_true", help="Affiche les imports les plus lents.")
+    args = parser.parse_args()
+
+    for name, cmd in _targets().items():
+        try:
+            times = [_time_once(cmd) for _ in range(args.n)]
+        except RuntimeError as e:
+            print(f"{name:<20} SKIPPED ({e})")
+            continue
+        print(f"{name:<20} min {min(times) * 1000:7.1f} ms | "
+              f"median {statistics.median(times) * 1000:7.1f} ms | max {max(times) * 1000:7.1f} ms")
+        if args.importtime:
+            for cumul_us, mod in _top_imports(cmd):
+                print(f"    {cumul_us / 1000:8.1f} ms  {mod}")
+
+
+if __name__ == "__main__":
+    main()